@@ -0,0 +1,336 @@
+import os
+import json
+import argparse
+import base64
+import hashlib
+import shutil
+import tempfile
+import threading
+import time
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from bs4 import BeautifulSoup
+
+import scrape_dockets
+
+logger = logging.getLogger(__name__)
+
+# --- Mock Kroll docket server ---
+# Serves a local stand-in for /bbby/Home-DocketInfo (same absolute XPaths for the table rows
+# and the 'Next' button), the JSON grid endpoint and /bbby/Home-DownloadPDF.
+
+DOCKET_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>Docket</title></head>
+<body><main>
+<div></div><div></div>
+<div>
+  <div></div>
+  <div>
+    <div></div>
+    <div><div></div><div>
+      <div><a href="?page=1">First</a><a href="?page={prev_page}">Previous</a>{next_link}</div>
+    </div></div>
+    <div><div></div><div>
+      <div></div><div></div>
+      <div><div></div><div></div><div></div>
+        <div><div><table>
+          <thead><tr><th>Docket #</th><th>Description</th><th>Date Filed</th></tr></thead>
+          <tbody>{rows}</tbody>
+        </table></div></div>
+      </div>
+    </div></div>
+  </div>
+</div>
+</main></body></html>
+"""
+
+ROW_TEMPLATE = (
+    '<tr><td>{docket_number}</td>'
+    '<td><span><p><a class="link" href="{href}">{title}</a></p></span></td>'
+    '<td>{date}</td></tr>'
+)
+
+CAPTCHA_PAGE = b"<html><body><h1>Please complete the captcha to download this document</h1></body></html>"
+
+class MockDocket:
+    """Settings and generated entries for the mock server."""
+
+    def __init__(self, entries=4150, page_size=25, latency=0.0, captcha_rate=0.0, pdf_size=200 * 1024):
+        self.entries = entries
+        self.page_size = page_size
+        self.latency = latency
+        self.captcha_rate = captcha_rate
+        self.pdf_body = b"%PDF-1.4\n" + b"0" * max(pdf_size - 15, 0) + b"\n%%EOF\n"
+
+    def entry(self, docket_number):
+        """Returns (href, title, date) for one docket entry; newest entries come first on page 1."""
+        document_id = 3650000 + docket_number
+        id1 = base64.b64encode(str(document_id).encode()).decode()
+        href = f"/bbby/Home-DownloadPDF?id1={id1}&id2=-1"
+        related = f" (related document(s){docket_number - 1}, {docket_number - 2})" if docket_number > 2 else ""
+        title = f"Affidavit of Service filed by Kroll Restructuring Administration LLC{related}."
+        date = f"{(docket_number % 12) + 1:02d}/{(docket_number % 28) + 1:02d}/2024"
+        return href, title, date
+
+    def page_entries(self, page, rows):
+        first = self.entries - (page - 1) * rows
+        return range(first, max(first - rows, 0), -1)
+
+    def total_pages(self, rows):
+        return (self.entries + rows - 1) // rows
+
+    def needs_captcha(self, id1):
+        """Deterministically picks captcha_rate of the documents to answer with a CAPTCHA page."""
+        digest = hashlib.sha256(id1.encode()).digest()
+        return digest[0] / 256 < self.captcha_rate
+
+def make_handler(docket):
+    class MockKrollHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+        def _send(self, body, content_type, status=200):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if docket.latency:
+                time.sleep(docket.latency)
+            parsed = urlparse(self.path)
+            query = parse_qs(parsed.query)
+            if parsed.path == "/bbby/Home-DocketInfo":
+                self._docket_page(int(query.get("page", ["1"])[0]))
+            elif parsed.path == "/bbby/Home-LoadDocketData":
+                self._docket_data(int(query.get("page", ["1"])[0]), int(query.get("rows", [str(docket.page_size)])[0]))
+            elif parsed.path == "/bbby/Home-DownloadPDF":
+                id1 = query.get("id1", [""])[0]
+                if docket.needs_captcha(id1):
+                    self._send(CAPTCHA_PAGE, "text/html; charset=utf-8")
+                else:
+                    self._send(docket.pdf_body, "application/pdf")
+            else:
+                self._send(b"Not found", "text/plain", status=404)
+
+        def _docket_page(self, page):
+            rows = []
+            for docket_number in docket.page_entries(page, docket.page_size):
+                href, title, date = docket.entry(docket_number)
+                rows.append(ROW_TEMPLATE.format(docket_number=docket_number, href=href.replace("&", "&amp;"), title=title, date=date))
+            if page < docket.total_pages(docket.page_size):
+                next_link = f'<a href="?page={page + 1}">Next</a>'
+            else:
+                next_link = ""
+            body = DOCKET_PAGE_TEMPLATE.format(prev_page=max(page - 1, 1), next_link=next_link, rows="".join(rows))
+            self._send(body.encode(), "text/html; charset=utf-8")
+
+        def _docket_data(self, page, rows):
+            items = []
+            for docket_number in docket.page_entries(page, rows):
+                href, title, date = docket.entry(docket_number)
+                items.append({
+                    "DocketNumber": str(docket_number),
+                    "DateFiled": date,
+                    "Description": f'<a class="link" href="{href}" title="{title}">{title}</a>',
+                })
+            body = json.dumps({"page": page, "total": docket.total_pages(rows), "records": docket.entries, "rows": items}).encode()
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+    return MockKrollHandler
+
+def start_mock_server(docket):
+    """Starts the mock server on a free local port and points scrape_dockets at it."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(docket))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    scrape_dockets.BASE_URL = base_url
+    scrape_dockets.PAGE_URL = f"{base_url}/bbby/Home-DocketInfo"
+    scrape_dockets.API_DOCKET_DATA_URL = f"{base_url}/bbby/Home-LoadDocketData"
+    logger.info(f"Mock Kroll docket server listening on {base_url}")
+    return server
+
+# --- Benchmarks ---
+
+def bench_extraction(pages, headless=True):
+    """Measures pages/sec for extract_pdf_infos_from_selenium_page in both modes.
+
+    Falls back to timing only the in-process HTML parsing when Chrome can't be started.
+    """
+    results = {}
+    try:
+        driver = scrape_dockets.create_driver(tempfile.gettempdir(), headless=headless)
+    except Exception as e:
+        logger.warning(f"Chrome unavailable ({e.__class__.__name__}); timing HTML snapshot parsing only.")
+        driver = None
+
+    if driver is not None:
+        try:
+            for snapshot in (True, False):
+                elapsed = 0.0
+                rows = 0
+                for page in range(1, pages + 1):
+                    driver.get(f"{scrape_dockets.PAGE_URL}?page={page}")
+                    started = time.perf_counter()
+                    rows += len(scrape_dockets.extract_pdf_infos_from_selenium_page(driver, snapshot=snapshot))
+                    elapsed += time.perf_counter() - started
+                mode = "selenium_snapshot" if snapshot else "selenium_per_element"
+                results[mode] = {"pages": pages, "rows": rows, "seconds": elapsed, "pages_per_sec": pages / elapsed}
+        finally:
+            driver.quit()
+
+    session = scrape_dockets.create_http_session()
+    tables = []
+    for page in range(1, pages + 1):
+        html = session.get(f"{scrape_dockets.PAGE_URL}?page={page}", timeout=30).text
+        tables.append(str(BeautifulSoup(html, "html.parser").find("table")))
+    started = time.perf_counter()
+    rows = sum(len(scrape_dockets.parse_pdf_infos_from_html(table, scrape_dockets.PAGE_URL)) for table in tables)
+    elapsed = time.perf_counter() - started
+    results["html_parse_only"] = {"pages": pages, "rows": rows, "seconds": elapsed, "pages_per_sec": pages / elapsed}
+    return results
+
+def bench_index_save(docket, workdir, checkpoints=(0, 1000, 2000, 4000, 8000)):
+    """Measures the cost of save_scraped_links for one page of rows as the index grows."""
+    store = scrape_dockets.open_link_store(os.path.join(workdir, "bench_links.db"))
+    results = []
+    docket_number = 1
+    try:
+        for size in checkpoints:
+            while len(store) < size:
+                batch = []
+                for _ in range(min(500, size - len(store))):
+                    href, title, date = docket.entry(docket_number)
+                    batch.append(scrape_dockets.build_pdf_info(scrape_dockets.BASE_URL + href, str(docket_number), title, date))
+                    docket_number += 1
+                scrape_dockets.save_scraped_links(store, batch)
+
+            page = []
+            for _ in range(docket.page_size):
+                href, title, date = docket.entry(docket_number)
+                page.append(scrape_dockets.build_pdf_info(scrape_dockets.BASE_URL + href, str(docket_number), title, date))
+                docket_number += 1
+            started = time.perf_counter()
+            scrape_dockets.save_scraped_links(store, page)
+            elapsed = time.perf_counter() - started
+            results.append({"index_size": size, "page_rows": len(page), "ms_per_page": elapsed * 1000})
+    finally:
+        store.close()
+    return results
+
+def bench_api_index(docket, workdir, rows):
+    """Measures a full index crawl through the JSON endpoint, then a re-crawl answered from the page cache."""
+    db_path = os.path.join(workdir, "bench_api_links.db")
+    store = scrape_dockets.open_link_store(db_path)
+    page_cache = scrape_dockets.PageCache(db_path)
+    session = scrape_dockets.create_http_session()
+    try:
+        timings = []
+        for _ in range(2):
+            started = time.perf_counter()
+            scrape_dockets.crawl_index_with_api(
+                session, store, rows, api_url=scrape_dockets.API_DOCKET_DATA_URL, referer=scrape_dockets.PAGE_URL,
+                page_cache=page_cache
+            )
+            timings.append(time.perf_counter() - started)
+        return {
+            "entries": len(store), "rows_per_request": rows, "seconds": timings[0],
+            "entries_per_sec": len(store) / timings[0], "recrawl_seconds": timings[1],
+        }
+    finally:
+        page_cache.close()
+        store.close()
+
+def bench_downloads(docket, workdir, count, workers, rate):
+    """Measures end-to-end PDFs/min for the HTTP download phase, with CAPTCHA items reported separately."""
+    download_dir = os.path.join(workdir, "pdfs")
+    scrape_dockets.create_download_directory(download_dir)
+    pdf_infos = []
+    for docket_number in range(docket.entries, docket.entries - count, -1):
+        href, title, date = docket.entry(docket_number)
+        pdf_infos.append(scrape_dockets.build_pdf_info(scrape_dockets.BASE_URL + href, str(docket_number), title, date))
+
+    manifest = scrape_dockets.DownloadManifest(os.path.join(workdir, "bench_manifest.db"))
+    try:
+        started = time.perf_counter()
+        # No browsers: CAPTCHA pages can't fall back to Chrome and come back CAPTCHA-blocked.
+        # No retry rounds either, so the time measured is downloading rather than backoff.
+        downloaded, failed, captcha_blocked = scrape_dockets.download_all(
+            pdf_infos, [None] * workers, download_dir, scrape_dockets.HostRateLimiter(rate, capacity=workers),
+            use_http=True, manifest=manifest, interactive=False, retry_rounds=0
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        manifest.close()
+    return {
+        "pdfs": count, "workers": workers, "downloaded": downloaded, "failed": failed, "captcha_blocked": captcha_blocked,
+        "seconds": elapsed, "pdfs_per_min": downloaded / elapsed * 60,
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark DocketRocket against a local mock Kroll docket server.")
+    parser.add_argument("--entries", type=int, default=4150, help="Docket entries served by the mock (default: 4150).")
+    parser.add_argument("--page-size", type=int, default=25, help="Rows per rendered docket page (default: 25).")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of latency added to every mock response.")
+    parser.add_argument("--captcha-rate", type=float, default=0.0, help="Fraction of PDFs answered with a CAPTCHA page.")
+    parser.add_argument("--pdf-size", type=int, default=200 * 1024, help="Bytes per mock PDF (default: 204800).")
+    parser.add_argument("--pages", type=int, default=10, help="Docket pages to time for row extraction (default: 10).")
+    parser.add_argument("--api-rows", type=int, default=scrape_dockets.API_ROWS_PER_PAGE, help="Rows per JSON index request.")
+    parser.add_argument("--downloads", type=int, default=200, help="PDFs to download in the download benchmark (default: 200).")
+    parser.add_argument("--workers", type=int, default=4, help="Download workers (default: 4).")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Download rate limit per second (default: 1000, effectively off).")
+    parser.add_argument("--headed", action="store_true", help="Show the Chrome window during the extraction benchmark.")
+    parser.add_argument("--output", help="Also write the results as JSON to this file.")
+    return parser.parse_args(argv)
+
+def main(args):
+    docket = MockDocket(args.entries, args.page_size, args.latency, args.captcha_rate, args.pdf_size)
+    server = start_mock_server(docket)
+    workdir = tempfile.mkdtemp(prefix="docketrocket-bench-")
+    try:
+        results = {
+            "extraction": bench_extraction(args.pages, headless=not args.headed),
+            "index_save": bench_index_save(docket, workdir),
+            "api_index": bench_api_index(docket, workdir, args.api_rows),
+            "downloads": bench_downloads(docket, workdir, args.downloads, args.workers, args.rate),
+        }
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("--- Row extraction ---")
+    for mode, r in results["extraction"].items():
+        print(f"{mode:22} {r['pages_per_sec']:10.1f} pages/s  ({r['rows']} rows in {r['seconds']:.3f}s)")
+    print("--- save_scraped_links per page ---")
+    for r in results["index_save"]:
+        print(f"index size {r['index_size']:6}  {r['ms_per_page']:8.2f} ms for {r['page_rows']} rows")
+    r = results["api_index"]
+    print("--- API index crawl ---")
+    print(f"{r['entries']} entries in {r['seconds']:.2f}s ({r['entries_per_sec']:.0f} entries/s, {r['rows_per_request']} rows/request)")
+    print(f"unchanged re-crawl from the page cache in {r['recrawl_seconds']:.2f}s")
+    r = results["downloads"]
+    print("--- Downloads ---")
+    print(f"{r['downloaded']}/{r['pdfs']} PDFs with {r['workers']} workers in {r['seconds']:.2f}s = {r['pdfs_per_min']:.0f} PDFs/min ({r['failed']} failed, {r['captcha_blocked']} CAPTCHA-blocked)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    main(parse_args())
@@ -1,5 +1,6 @@
 import os
 import json
+import argparse
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse, parse_qs
@@ -7,22 +8,101 @@ import time
 import logging
 import random
 import re
+import queue
+import sqlite3
+import shutil
+import hashlib
+import base64
+import binascii
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.options import Options
 
+try:
+    # Optional: lets DownloadWatcher react to file system events instead of polling
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = None
+
+try:
+    # Optional: needed only for the full-text index of downloaded PDFs
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
 BASE_URL = "https://restructuring.ra.kroll.com" 
 PAGE_URL = "https://restructuring.ra.kroll.com/bbby/Home-DocketInfo"
 DOWNLOAD_DIR = r"C:\Users\Ross Brown\OneDrive\DocketRocketSource"
+LINKS_DB = "scraped_links.db"
+# Legacy JSON index, imported into LINKS_DB the first time the store is created
 LINKS_FILE = "scraped_links.json"
+METRICS_JSON_FILE = "metrics.jsonl"
+METRICS_PROM_FILE = "metrics.prom"
+
+# JSON endpoint behind the docket grid (same data as PAGE_URL, paged by 'page'/'rows'), relative
+# to the case's docket page. UNVERIFIED: the name is guessed from the site's Home-DocketInfo and
+# Home-DownloadPDF routes and has not been seen in a real session; override it with --api-endpoint.
+API_DOCKET_DATA_ENDPOINT = "Home-LoadDocketData"
+API_DOCKET_DATA_URL = urljoin(PAGE_URL, API_DOCKET_DATA_ENDPOINT)
+API_ROWS_PER_PAGE = 1000
+DOWNLOAD_WORKERS = 1
+DOWNLOAD_RATE_PER_SECOND = 0.5
+# Adaptive pacing: response time smoothing, what counts as a slow response, and error backoff
+LATENCY_SMOOTHING = 0.2
+SLOW_RESPONSE_FACTOR = 2.0
+BACKOFF_BASE_SECONDS = 2
+BACKOFF_MAX_SECONDS = 300
+DOWNLOAD_RETRY_ROUNDS = 2
+# Returned by fetch_api_page_data in place of the JSON when a page hasn't changed
+PAGE_NOT_MODIFIED = object()
+# Returned by the download functions when a CAPTCHA page needs a browser, or a person, that isn't there
+CAPTCHA_BLOCKED = object()
+# Returned by download_pdf_via_http when the server says the document doesn't exist (HTTP 404/410)
+DOCUMENT_MISSING = object()
+# Links waiting between the crawler and the download workers; the crawler pauses when it is full
+PIPELINE_QUEUE_SIZE = 200
+PAGE_RETRIES = 3
+PAGE_LOAD_TIMEOUT = 30
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+VERIFY_WORKERS = 8
+# Bytes at the end of a PDF searched for its %%EOF trailer (writers may append whitespace or junk)
+PDF_TRAILER_WINDOW = 1024
+FILENAME_MAX_LENGTH = 180
+FILENAME_HASH_LENGTH = 8
+TEXT_INDEX_WORKERS = os.cpu_count() or 4
+SEARCH_RESULTS = 20
+# Browser download completion: give up if Chrome hasn't created a file after DOWNLOAD_START_TIMEOUT
+# seconds, or if a partial download hasn't grown for DOWNLOAD_STALL_TIMEOUT seconds
+DOWNLOAD_START_TIMEOUT = 10
+DOWNLOAD_STALL_TIMEOUT = 30
+DOWNLOAD_POLL_INTERVAL = 0.1
+# Each browser saves into <download dir>/<this>/<session id> so its file can be told apart and renamed
+BROWSER_DOWNLOAD_SUBDIR = ".incoming"
+HTTP_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36'
 
 # --- Selenium WebDriver Configuration ---
 driver_path = r"D:\chromedriver-win64\chromedriver.exe" 
+# Persistent Chrome user data directory (keeps the solved-CAPTCHA cookies between runs)
+CHROME_PROFILE_DIR = "chrome_profile"
+# Profile entries not worth copying into the per-worker clones
+CHROME_PROFILE_SKIP = ("Singleton*", "lockfile", "Cache", "Code Cache", "GPUCache", "Service Worker", "Crashpad")
+
+# Absolute XPaths into the Kroll docket page
+DOCKET_TABLE_XPATH = "/html/body/main/div[3]/div[2]/div[3]/div[2]/div[3]/div[4]/div[1]/table"
+DOCKET_ROWS_XPATH = DOCKET_TABLE_XPATH + "/tbody/tr"
+NEXT_BUTTON_XPATH = "/html/body/main/div[3]/div[2]/div[2]/div[2]/div[1]/a[3]"
 
 # --- Logging Setup ---
 logger = logging.getLogger(__name__)
@@ -46,27 +126,126 @@ def setup_logging():
     console_handler.setFormatter(console_formatter)
     
     logging.getLogger('').addHandler(console_handler)
+    # Keep the HTTP/WebDriver wire chatter out of our DEBUG log
+    for noisy_logger in ('urllib3', 'selenium', 'watchdog'):
+        logging.getLogger(noisy_logger).setLevel(logging.WARNING)
+    # pypdf warns about every malformed object it recovers from
+    logging.getLogger('pypdf').setLevel(logging.ERROR)
     
     logger.info(f"Logging configured. DEBUG output to: {log_file_path}. INFO output to console.")
 # --- End Logging Setup ---
 
-def sanitize_filename(filename):
-    """Removes or replaces characters that are invalid in Windows filenames."""
+# --- Metrics ---
+class Metrics:
+    """Thread-safe per-stage timings and counters for one run.
+
+    Stages record call count, total and max seconds; counters are plain totals. `write`
+    appends a JSON summary line per run and rewrites a Prometheus text exposition file.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.stages = {}
+        self.counters = {}
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            stats = self.stages.setdefault(stage, {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            stats['count'] += 1
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def incr(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def summary(self):
+        with self.lock:
+            return {
+                'started_at': datetime.fromtimestamp(self.started, timezone.utc).isoformat(timespec='seconds'),
+                'run_seconds': time.time() - self.started,
+                'stages': {stage: dict(stats) for stage, stats in self.stages.items()},
+                'counters': dict(self.counters),
+            }
+
+    def to_prometheus(self):
+        summary = self.summary()
+        lines = [
+            "# HELP docketrocket_run_seconds Wall-clock duration of the last run.",
+            "# TYPE docketrocket_run_seconds gauge",
+            f"docketrocket_run_seconds {summary['run_seconds']:.3f}",
+            "# HELP docketrocket_stage_seconds_total Time spent per stage.",
+            "# TYPE docketrocket_stage_seconds_total counter",
+        ]
+        lines += [f'docketrocket_stage_seconds_total{{stage="{stage}"}} {stats["seconds"]:.3f}' for stage, stats in sorted(summary['stages'].items())]
+        lines += ["# HELP docketrocket_stage_calls_total Times each stage ran.", "# TYPE docketrocket_stage_calls_total counter"]
+        lines += [f'docketrocket_stage_calls_total{{stage="{stage}"}} {stats["count"]}' for stage, stats in sorted(summary['stages'].items())]
+        lines += ["# HELP docketrocket_stage_max_seconds Slowest single call per stage.", "# TYPE docketrocket_stage_max_seconds gauge"]
+        lines += [f'docketrocket_stage_max_seconds{{stage="{stage}"}} {stats["max_seconds"]:.3f}' for stage, stats in sorted(summary['stages'].items())]
+        for counter, value in sorted(summary['counters'].items()):
+            lines += [f"# TYPE docketrocket_{counter}_total counter", f"docketrocket_{counter}_total {value}"]
+        return "\n".join(lines) + "\n"
+
+    def write(self, json_path=None, prometheus_path=None):
+        """Appends the JSON summary to `json_path` and atomically rewrites `prometheus_path`."""
+        try:
+            if json_path:
+                with open(json_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(self.summary()) + "\n")
+            if prometheus_path:
+                temp_path = prometheus_path + ".tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.write(self.to_prometheus())
+                os.replace(temp_path, prometheus_path)
+        except Exception as e:
+            logger.error(f"Failed to write metrics: {e}")
+
+    def log_summary(self):
+        summary = self.summary()
+        logger.info(f"--- Metrics ({summary['run_seconds']:.1f}s wall clock) ---")
+        for stage, stats in sorted(summary['stages'].items(), key=lambda item: -item[1]['seconds']):
+            logger.info(f"{stage:20} {stats['seconds']:9.2f}s total  {stats['count']:6} calls  max {stats['max_seconds']:.2f}s")
+        for counter, value in sorted(summary['counters'].items()):
+            logger.info(f"{counter:20} {value}")
+
+metrics = Metrics()
+# --- End Metrics ---
+
+# Characters Windows rejects in file names become "_"; ASCII control characters are dropped
+FILENAME_TRANSLATION = str.maketrans({**{char: '_' for char in '<>:"/\\|?*'}, **{chr(code): None for code in range(32)}})
+UNDERSCORE_RUNS_RE = re.compile(r'__+')
+
+def short_hash(text):
+    """Deterministic 8-character digest used to tell apart names that would otherwise clash."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:FILENAME_HASH_LENGTH]
+
+def sanitize_filename(filename, max_length=FILENAME_MAX_LENGTH):
+    """Removes or replaces characters that are invalid in Windows filenames.
+
+    Names longer than `max_length` are cut and end in a hash of the full name, so two long
+    titles sharing a prefix still get different names.
+    """
     if not filename:
         return "untitled_document"
-    # Remove characters that are definitely invalid
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-    # Remove control characters (ASCII 0-31)
-    filename = re.sub(r'[\x00-\x1F]', '', filename)
-    # Replace multiple underscores with a single one
-    filename = re.sub(r'_+', '_', filename)
+    sanitized = filename.translate(FILENAME_TRANSLATION)
+    if '__' in sanitized:
+        sanitized = UNDERSCORE_RUNS_RE.sub('_', sanitized)
     # Remove leading/trailing whitespace, periods, and underscores
-    filename = filename.strip().strip('._ ')
-    # Limit length
-    filename = filename[:180] 
-    if not filename: 
+    sanitized = sanitized.strip().strip('._ ')
+    if len(sanitized) > max_length:
+        sanitized = sanitized[:max_length - FILENAME_HASH_LENGTH - 1].rstrip('._ ') + '-' + short_hash(filename)
+    if not sanitized:
         return "sanitized_document"
-    return filename
+    return sanitized
 
 def create_download_directory(directory):
     """Creates the download directory if it doesn't exist."""
@@ -76,217 +255,1441 @@ def create_download_directory(directory):
     else:
         logger.info(f"Directory already exists: {directory}")
 
-def load_scraped_links(filename):
-    """Load previously scraped PDF info from a JSON file."""
-    if os.path.exists(filename):
+LINK_FIELDS = ('url', 'docket_number', 'title', 'date', 'filename_suggestion', 'original_href')
+
+def document_id(url):
+    """Decodes the base64 `id1` parameter of a Kroll download URL into its integer document ID.
+
+    Returns None for URLs without a decodable numeric `id1` (e.g. CAPTCHA links).
+    """
+    values = parse_qs(urlparse(url).query).get('id1')
+    if not values:
+        return None
+    try:
+        decoded = base64.b64decode(values[0], validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return int(decoded) if decoded.isdigit() else None
+
+def parse_docket_number(value):
+    """Returns a docket number as an int, or None when it isn't purely numeric (e.g. "12A" or blank)."""
+    value = str(value or '').strip()
+    return int(value) if value.isdigit() else None
+
+class DocketEntry:
+    """One docket index entry, stored compactly.
+
+    Dates are interned (thousands of entries share a few hundred filing dates) and
+    `original_href` is the URL itself rather than a second copy. The docket number keeps
+    its text, so numbers like "12A" survive; `docket_int` holds it as an int when it is
+    purely numeric. `doc_id` is the document ID decoded from the URL's `id1` parameter.
+    Entries can be read like the pdf_info dicts used elsewhere: `entry['url']`,
+    `entry.get('title')`.
+    """
+
+    __slots__ = ('doc_id', 'url', 'docket_number', 'docket_int', 'title', 'date', 'filename_suggestion')
+
+    def __init__(self, url, docket_number, title, date, filename_suggestion):
+        self.doc_id = document_id(url)
+        self.url = url
+        self.docket_number = str(docket_number or '').strip()
+        self.docket_int = parse_docket_number(self.docket_number)
+        self.title = title or ''
+        self.date = sys.intern(date or '')
+        self.filename_suggestion = filename_suggestion or ''
+
+    @classmethod
+    def from_info(cls, info):
+        """Builds an entry from a pdf_info dict, e.g. one read from the legacy JSON file."""
+        if isinstance(info, cls):
+            return info
+        return cls(info['url'], info.get('docket_number'), info.get('title'), info.get('date'), info.get('filename_suggestion'))
+
+    @property
+    def original_href(self):
+        return self.url
+
+    @property
+    def key(self):
+        """Deduplication key: the document ID, or the URL when it has none."""
+        return self.url if self.doc_id is None else self.doc_id
+
+    def __getitem__(self, field):
+        if field not in LINK_FIELDS:
+            raise KeyError(field)
+        value = getattr(self, field)
+        return '' if value is None else value
+
+    def get(self, field, default=None):
+        value = getattr(self, field, None) if field in LINK_FIELDS else None
+        return default if value is None else value
+
+    def __repr__(self):
+        return f"DocketEntry(doc_id={self.doc_id!r}, docket_number={self.docket_number!r}, date={self.date!r}, title={self.title[:40]!r})"
+
+class LinkStore:
+    """SQLite-backed index of scraped PDF links with unique indexes on URL and docket number.
+
+    Rows are inserted as they are found, so each page costs only its own inserts and a crash
+    never loses what was already committed. The document IDs of indexed entries are also
+    kept in an in-memory integer set, so duplicate checks don't need a query.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS links ("
+                "id INTEGER PRIMARY KEY, url TEXT NOT NULL, docket_number TEXT, title TEXT, "
+                "date TEXT, filename_suggestion TEXT, original_href TEXT)"
+            )
+            self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS links_url ON links (url)")
+            self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS links_docket_number ON links (docket_number)")
+            urls = self.conn.execute("SELECT url FROM links").fetchall()
+        self.doc_ids = {doc_id for doc_id in (document_id(url) for (url,) in urls) if doc_id is not None}
+
+    def add(self, pdf_infos):
+        """Inserts entries whose document ID, URL and docket number are not indexed yet; returns the new ones as DocketEntry records."""
+        new_infos = []
+        with self.lock, self.conn:
+            for info in pdf_infos:
+                entry = DocketEntry.from_info(info)
+                if entry.doc_id is not None and entry.doc_id in self.doc_ids:
+                    continue
+                # Rows without a docket number are stored as NULL so they don't collide on the unique index
+                values = [entry.get(field) or None for field in LINK_FIELDS]
+                cursor = self.conn.execute(
+                    f"INSERT OR IGNORE INTO links ({', '.join(LINK_FIELDS)}) VALUES ({', '.join('?' * len(LINK_FIELDS))})",
+                    values
+                )
+                if cursor.rowcount:
+                    if entry.doc_id is not None:
+                        self.doc_ids.add(entry.doc_id)
+                    new_infos.append(entry)
+        return new_infos
+
+    def has_url(self, url):
+        """True when the document behind `url` is indexed; checks the ID set when the URL carries one."""
+        doc_id = document_id(url)
+        with self.lock:
+            if doc_id is not None:
+                return doc_id in self.doc_ids
+            return self.conn.execute("SELECT 1 FROM links WHERE url = ?", (url,)).fetchone() is not None
+
+    def has_docket_number(self, docket_number):
+        """True when an entry with this docket number is indexed; blank numbers never match."""
+        docket_number = str(docket_number or '').strip()
+        if not docket_number:
+            return False
+        with self.lock:
+            return self.conn.execute(
+                "SELECT 1 FROM links WHERE docket_number = ?", (docket_number,)
+            ).fetchone() is not None
+
+    def highest_docket_number(self):
+        """Returns the highest numeric docket number in the index, or None if there is none."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT MAX(CAST(docket_number AS INTEGER)) FROM links WHERE docket_number NOT GLOB '*[^0-9]*'"
+            ).fetchone()
+        return row[0]
+
+    def all(self):
+        """Returns every indexed entry as a DocketEntry, in the order it was found."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT url, docket_number, title, date, filename_suggestion FROM links ORDER BY id"
+            ).fetchall()
+        return [DocketEntry(*row) for row in rows]
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+def open_link_store(path, legacy_json_file=None):
+    """Opens the link store, importing a legacy scraped_links.json the first time it is created."""
+    store = LinkStore(path)
+    if legacy_json_file and len(store) == 0 and os.path.exists(legacy_json_file):
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                return json.load(f)
+            with open(legacy_json_file, "r", encoding="utf-8") as f:
+                imported = store.add(json.load(f))
+            logger.info(f"Imported {len(imported)} links from {legacy_json_file} into {path}.")
         except Exception as e:
-            logger.error(f"Failed to load existing link file {filename}: {e}")
-    return []
+            logger.error(f"Failed to import existing link file {legacy_json_file}: {e}")
+    return store
 
-def save_scraped_links(filename, links):
-    """Persist scraped PDF info to a JSON file."""
+def load_scraped_links(store):
+    """Load previously scraped PDF info from the link store."""
     try:
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(links, f, indent=2)
+        return store.all()
     except Exception as e:
-        logger.error(f"Failed to save scraped links to {filename}: {e}")
-
-# def fetch_api_page_data(session, page_num, rows_per_page):
-#     """(Obsolete with Selenium) Fetches a single page of docket data from the Kroll API."""
-#     params = {
-#         'page': page_num,
-#         'rows': rows_per_page,
-#         # 'sidx': 'DocketNumberSort', # Temporarily removed for testing
-#         # 'sord': 'asc' # Temporarily removed for testing
-#     }
-#     headers = {
-#         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-#         'Referer': PAGE_URL, # The main docket page
-#         'Accept': 'application/json, text/javascript, */*; q=0.01', # Mimic browser accept header
-#         'X-Requested-With': 'XMLHttpRequest' # Common for AJAX requests
-#     }
-#     try:
-#         logger.info(f"Fetching API data: page {page_num}, rows {rows_per_page}, params: {params}")
-# #         response = session.get(API_DOCKET_DATA_URL, params=params, headers=headers, timeout=30)
-#         
-#         logger.debug(f"API response for page {page_num}: Status Code: {response.status_code}, Headers: {response.headers}")
-#         
-#         # Check for non-200 status codes specifically before trying to parse JSON
-#         if response.status_code != 200:
-#             logger.error(f"API request for page {page_num} returned status {response.status_code}, not 200.")
-#             logger.debug(f"Response text for status {response.status_code} (first 500 chars): {response.text[:500]}...")
-#             # If it's 202, it might be an empty body, which is not a typical HTTPError caught by raise_for_status for 2xx codes
-#             if response.status_code == 202 and not response.text.strip():
-#                 logger.warning(f"API returned 202 with empty body for page {page_num}. Treating as no data.")
-#                 return None # Or an empty dict/list structure if your main loop expects it
-#             # For other non-200s, try to raise for status if it wasn't a 2xx that slipped through
-#             response.raise_for_status() # This will raise an HTTPError for 4xx/5xx client/server errors
-# 
-#         if not response.text.strip():
-#             logger.warning(f"API response for page {page_num} is empty. Status: {response.status_code}")
-#             return None # Or an empty dict/list structure
-#             
-#         logger.debug(f"Successfully fetched API data for page {page_num}. Status: {response.status_code}. Attempting JSON parse.")
-#         return response.json()
-#     
-#     except requests.exceptions.HTTPError as http_err:
-#         logger.error(f"HTTP error occurred while fetching API data (page {page_num}): {http_err}")
-#         if http_err.response is not None:
-#             logger.error(f"Status Code: {http_err.response.status_code}")
-#             logger.error(f"Response Headers: {http_err.response.headers}")
-#             logger.debug(f"Full Response Text (first 500 chars): {http_err.response.text[:500]}...")
-#         return None
-#     except requests.exceptions.RequestException as req_err: # Catches other network errors like DNS, connection refused
-#         logger.exception(f"Request error occurred while fetching API data (page {page_num}): {req_err}")
-#         return None
-#     except json.JSONDecodeError as json_err:
-#         logger.error(f"JSON decode error for API response (page {page_num}): {json_err}")
-#         logger.debug(f"Response text that failed to parse (first 500 chars): {response.text[:500]}...")
-#         return None
-
-# def extract_pdf_infos_from_api_response(json_data):
-#     """(Obsolete with Selenium) Extracts PDF information from the Kroll API JSON response."""
-#     pdf_infos = []
-#     if not json_data or 'rows' not in json_data:
-#         logger.warning("No 'rows' found in API JSON response or JSON data is empty.")
-#         return pdf_infos
-# 
-#     for item in json_data['rows']:
-#         description_html = item.get('Description', '')
-#         docket_number = item.get('DocketNumber', 'UnknownDocket').strip()
-#         date_filed_raw = item.get('DateFiled', 'UnknownDate').strip()
-#         # Sanitize date_filed for filename (e.g. '01/25/2024' -> '01_25_2024')
-#         date_filed_clean = date_filed_raw.replace('/', '_')
-# 
-#         if not description_html:
-#             logger.debug(f"Skipping item with empty Description (Docket: {docket_number})")
-#             continue
-# 
-#         soup = BeautifulSoup(description_html, 'html.parser')
-#         link_tag = soup.find('a', class_='link', href=True)
-# 
-#         if link_tag:
-#             href = link_tag['href']
-#             onclick_attr = link_tag.get('onclick', '')
-#             title_attr = link_tag.get('title', '').strip()
-# 
-#             if href.startswith('/bbby/Home-DownloadPDF') and 'OpenDialog_DocketCaptcha' not in onclick_attr:
-#                 absolute_url = urljoin(BASE_URL, href)
-#                 
-#                 # Construct a descriptive filename base
-#                 # Example: Docket_123_Exhibit_A_to_Declaration_01_25_2024
-#                 filename_base_parts = []
-#                 if docket_number and docket_number != 'UnknownDocket':
-#                     filename_base_parts.append(f"Docket_{docket_number}")
-#                 if title_attr:
-#                     filename_base_parts.append(title_attr)
-#                 if date_filed_clean and date_filed_clean != 'UnknownDate':
-#                     filename_base_parts.append(date_filed_clean)
-#                 
-#                 if not filename_base_parts: # Fallback if all parts are empty
-#                     filename_suggestion = f"Document_ID_{parse_qs(urlparse(href).query).get('id1',['unknown'])[0]}"
-#                 else:
-#                     filename_suggestion = "_".join(filename_base_parts)
-#                 
-#                 sanitized_filename_suggestion = sanitize_filename(filename_suggestion)
-# 
-#                 pdf_infos.append({
-#                     'url': absolute_url,
-#                     'filename_suggestion': sanitized_filename_suggestion, # This will be used by download_pdf
-#                     'original_href': href,
-#                     'docket_number': docket_number,
-#                     'date_filed': date_filed_raw # Store original date for logging/metadata if needed
-#                 })
-#                 logger.debug(f"Found PDF: URL='{absolute_url}', Suggested Filename='{sanitized_filename_suggestion}.pdf', Docket='{docket_number}'")
-#             elif href.startswith('/bbby/Home-DownloadPDF'):
-#                 logger.info(f"Skipping CAPTCHA link: Docket='{docket_number}', Title='{title_attr}', Href='{href}'")
-#         else:
-#             logger.debug(f"No 'a.link' tag found in Description for Docket: {docket_number}")
-#             
-#     logger.info(f"Extracted {len(pdf_infos)} non-CAPTCHA PDF links from API response page.")
-#     return pdf_infos
-
-# Track whether we've already manually solved the CAPTCHA during this run
-captcha_solved = False
-
-
-def download_pdf(driver, pdf_info, directory):
-    """Downloads a single PDF from the given pdf_info to the specified directory."""
-    pdf_url = pdf_info['url']
-    filename_suggestion_base = pdf_info.get('filename_suggestion', 'untitled_document')
+        logger.error(f"Failed to load links from {store.path}: {e}")
+    return []
 
-    global captcha_solved
+def save_scraped_links(store, links):
+    """Persist scraped PDF info to the link store; returns the entries that were not indexed yet."""
     try:
-        filepath = os.path.join(directory, filename_suggestion_base + ".pdf")
-        if os.path.exists(filepath):
-            logger.info(f"File already exists, skipping download: {filepath}")
-            return True
+        return store.add(links)
+    except Exception as e:
+        logger.error(f"Failed to save scraped links to {store.path}: {e}")
+    return []
 
-        logger.info(f"Attempting to navigate to PDF URL via Selenium: {pdf_url}")
-        driver.get(pdf_url)
-        time.sleep(random.uniform(1, 3))  # Allow page or captcha to render
+class PageCache:
+    """Remembers each crawled index page's validators and the rows extracted from it.
 
-        page_source = driver.page_source.lower()
-        captcha_present = 'captcha' in page_source
+    Validators are the response's ETag/Last-Modified headers, when the site sends them, and
+    a SHA-256 of the page content (the API's JSON body or the rendered table HTML). A later
+    crawl sends them as a conditional request and reuses the cached rows instead of parsing
+    a page that hasn't changed. Lives in its own table of the links database.
+    """
 
-        if captcha_present and not captcha_solved:
-            print("\n--- HUMAN INTERVENTION REQUIRED ---")
-            print(
-                f"Navigated to: {pdf_url} (for docket item: {pdf_info.get('docket_number', 'N/A')}, title: {pdf_info.get('title', 'N/A')})"
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS page_cache ("
+                "page_key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_hash TEXT NOT NULL, "
+                "total_pages INTEGER, rows TEXT NOT NULL, fetched_at TEXT NOT NULL)"
             )
-            print("Please solve the CAPTCHA in the Selenium browser window.")
-            print(
-                f"The PDF should then download automatically to: {directory} as {filename_suggestion_base}.pdf"
+
+    def get(self, page_key):
+        """Returns the cached page as a dict (rows as DocketEntry records), or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, content_hash, total_pages, rows FROM page_cache WHERE page_key = ?",
+                (page_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, content_hash, total_pages, rows = row
+        return {
+            'etag': etag, 'last_modified': last_modified, 'content_hash': content_hash, 'total_pages': total_pages,
+            'rows': [DocketEntry(*fields) for fields in json.loads(rows)],
+        }
+
+    def put(self, page_key, content_hash, pdf_infos, etag=None, last_modified=None, total_pages=None):
+        rows = json.dumps([
+            [info['url'], info.get('docket_number'), info.get('title'), info.get('date'), info.get('filename_suggestion')]
+            for info in pdf_infos
+        ])
+        fetched_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO page_cache (page_key, etag, last_modified, content_hash, total_pages, rows, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (page_key, etag, last_modified, content_hash, total_pages, rows, fetched_at)
             )
-            input("Press Enter here AFTER the CAPTCHA is solved and the PDF is saved...")
-            captcha_solved = True
+
+    def close(self):
+        self.conn.close()
+
+def create_http_adapter(pool_size=10):
+    """Creates the connection pool behind the HTTP sessions; `pool_size` connections are kept open per host."""
+    return requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+
+def create_http_session(driver=None, pool_size=10, adapter=None):
+    """Creates a requests.Session for the Kroll site, copying cookies from a WebDriver if given.
+
+    `pool_size` is the number of connections kept open per host, so one session can be
+    shared by that many worker threads. Passing `adapter` (see create_http_adapter) makes
+    the session use that shared connection pool while keeping a cookie jar of its own.
+    """
+    session = requests.Session()
+    if adapter is None:
+        adapter = create_http_adapter(pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        'User-Agent': HTTP_USER_AGENT,
+        'Referer': PAGE_URL, # The main docket page
+    })
+    if driver is not None:
+        copy_driver_cookies(driver, session)
+    return session
+
+def copy_driver_cookies(driver, session):
+    """Copies the cookies of the Selenium session into a requests.Session."""
+    for cookie in driver.get_cookies():
+        session.cookies.set(
+            cookie['name'],
+            cookie['value'],
+            domain=cookie.get('domain'),
+            path=cookie.get('path', '/')
+        )
+    logger.debug(f"Copied {len(session.cookies)} cookies from the WebDriver session.")
+
+def fetch_api_page_data(session, page_num, rows_per_page, api_url=API_DOCKET_DATA_URL, referer=PAGE_URL, rate_limiter=None,
+                        cached_page=None):
+    """Fetches a single page of docket data from the Kroll API, reporting the outcome to `rate_limiter`.
+
+    Returns a (json_data, validators) tuple, or (None, None) on failure. `validators` holds
+    the response's etag, last_modified and content_hash. With `cached_page` (an entry from
+    PageCache) the request is conditional, and json_data is PAGE_NOT_MODIFIED when the server
+    answers 304 or the body hashes the same as the cached one, so it isn't decoded again.
+    """
+    params = {
+        'page': page_num,
+        'rows': rows_per_page,
+    }
+    headers = {
+        'Referer': referer, # The case's docket page
+        'Accept': 'application/json, text/javascript, */*; q=0.01', # Mimic browser accept header
+        'X-Requested-With': 'XMLHttpRequest' # Common for AJAX requests
+    }
+    if cached_page is not None:
+        if cached_page['etag']:
+            headers['If-None-Match'] = cached_page['etag']
+        if cached_page['last_modified']:
+            headers['If-Modified-Since'] = cached_page['last_modified']
+    response = None
+    try:
+        logger.info(f"Fetching API data: page {page_num}, rows {rows_per_page}")
+        if rate_limiter is not None:
+            rate_limiter.wait(api_url)
+        started = time.monotonic()
+        with metrics.timer('page_load'):
+            response = session.get(api_url, params=params, headers=headers, timeout=30)
+        if rate_limiter is not None:
+            if response.status_code >= 400:
+                # Back off on 403/404 too, so the caller's page retries aren't sent back to back
+                rate_limiter.record_failure(api_url, f"HTTP {response.status_code}", retry_after_seconds(response))
+            else:
+                rate_limiter.record_success(api_url, time.monotonic() - started)
+        logger.debug(f"API response for page {page_num}: Status Code: {response.status_code}, Headers: {response.headers}")
+
+        if response.status_code == 304 and cached_page is not None:
+            # A 304 may carry fresh validators; keep the cached ones for anything it leaves out
+            return PAGE_NOT_MODIFIED, {
+                'etag': response.headers.get('ETag') or cached_page['etag'],
+                'last_modified': response.headers.get('Last-Modified') or cached_page['last_modified'],
+                'content_hash': cached_page['content_hash'],
+            }
+        if response.status_code == 202 and not response.text.strip():
+            logger.warning(f"API returned 202 with empty body for page {page_num}. Treating as no data.")
+            return None, None
+        response.raise_for_status() # This will raise an HTTPError for 4xx/5xx client/server errors
+
+        if not response.text.strip():
+            logger.warning(f"API response for page {page_num} is empty. Status: {response.status_code}")
+            return None, None
+
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_hash': hashlib.sha256(response.content).hexdigest(),
+        }
+        if cached_page is not None and validators['content_hash'] == cached_page['content_hash']:
+            return PAGE_NOT_MODIFIED, validators
+        json_data = response.json()
+        if not isinstance(json_data, dict):
+            raise ValueError(f"expected a JSON object, got {type(json_data).__name__}")
+        json_data['total'] = int(json_data.get('total') or 1)
+        return json_data, validators
+
+    except requests.exceptions.HTTPError as http_err:
+        logger.error(f"HTTP error occurred while fetching API data (page {page_num}): {http_err}")
+        if http_err.response is not None:
+            logger.debug(f"Full Response Text (first 500 chars): {http_err.response.text[:500]}...")
+        return None, None
+    except requests.exceptions.RequestException as req_err: # Catches other network errors like DNS, connection refused
+        logger.error(f"Request error occurred while fetching API data (page {page_num}): {req_err}")
+        if rate_limiter is not None:
+            rate_limiter.record_failure(api_url, req_err.__class__.__name__)
+        return None, None
+    except (ValueError, TypeError) as json_err:
+        logger.error(f"Malformed JSON in API response (page {page_num}): {json_err}")
+        logger.debug(f"Response text that failed to parse (first 500 chars): {response.text[:500]}...")
+        return None, None
+
+def is_download_pdf_href(href):
+    """True for links to a case's Home-DownloadPDF route, e.g. '/bbby/Home-DownloadPDF?id1=...'."""
+    return bool(href) and urlparse(href).path.endswith('/Home-DownloadPDF')
+
+def extract_pdf_infos_from_api_response(json_data):
+    """Extracts PDF information from the Kroll API JSON response."""
+    pdf_infos = []
+    if not json_data or 'rows' not in json_data:
+        logger.warning("No 'rows' found in API JSON response or JSON data is empty.")
+        return pdf_infos
+
+    for item in json_data['rows']:
+        description_html = item.get('Description') or ''
+        docket_number = str(item.get('DocketNumber') or '').strip()
+        date_filed = str(item.get('DateFiled') or '').strip()
+
+        if not description_html:
+            logger.debug(f"Skipping item with empty Description (Docket: {docket_number})")
+            continue
+
+        soup = BeautifulSoup(description_html, 'html.parser')
+        link_tag = soup.find('a', class_='link', href=is_download_pdf_href)
+        if link_tag is None:
+            logger.debug(f"No 'a.link' download link found in Description for Docket: {docket_number}")
+            continue
+
+        # CAPTCHA links are kept; download_pdf deals with the CAPTCHA page
+        absolute_url = urljoin(BASE_URL, link_tag['href'])
+        title = _cell_text(link_tag) or link_tag.get('title', '').strip()
+        pdf_infos.append(build_pdf_info(absolute_url, docket_number, title, date_filed))
+
+    logger.info(f"Extracted {len(pdf_infos)} PDF links from API response page.")
+    return pdf_infos
+
+def crawl_index_with_api(session, store, rows_per_page=API_ROWS_PER_PAGE, known_docket_number=None,
+                         api_url=API_DOCKET_DATA_URL, referer=PAGE_URL, rate_limiter=None, on_new_links=None,
+                         page_cache=None):
+    """Collects the docket index through the JSON API instead of clicking through rendered pages.
+
+    If `known_docket_number` is given (incremental mode), the crawl stops at the first page
+    made up entirely of entries that are already indexed. A page that fails is retried up to
+    PAGE_RETRIES times, paced by `rate_limiter`'s backoff. With a `page_cache`, pages are
+    requested conditionally and unchanged ones reuse their cached rows.
+    """
+    page_num = 1
+    total_pages = None
+    while total_pages is None or page_num <= total_pages:
+        page_key = f"{api_url}?page={page_num}&rows={rows_per_page}"
+        cached_page = page_cache.get(page_key) if page_cache is not None else None
+        for attempt in range(PAGE_RETRIES + 1):
+            json_data, validators = fetch_api_page_data(
+                session, page_num, rows_per_page, api_url, referer, rate_limiter, cached_page
+            )
+            if json_data is not None:
+                break
+            if attempt < PAGE_RETRIES:
+                logger.info(f"Retrying API page {page_num} (attempt {attempt + 2} of {PAGE_RETRIES + 1})...")
+        if json_data is None:
+            logger.warning(f"No API data for page {page_num}. Stopping API crawl.")
+            break
+
+        if json_data is PAGE_NOT_MODIFIED:
+            logger.info(f"API page {page_num} is unchanged since the last crawl; using its cached rows.")
+            metrics.incr('pages_unchanged')
+            page_total_pages = cached_page['total_pages']
+            page_pdf_infos = cached_page['rows']
+            # Store the validators just returned and refresh fetched_at, so the next crawl's
+            # conditional request isn't sent with a stale ETag
+            page_cache.put(page_key, validators['content_hash'], page_pdf_infos, validators['etag'],
+                           validators['last_modified'], page_total_pages)
         else:
-            if captcha_present and captcha_solved:
+            page_total_pages = json_data['total']
+            page_pdf_infos = extract_pdf_infos_from_api_response(json_data)
+            if page_cache is not None:
+                page_cache.put(page_key, validators['content_hash'], page_pdf_infos, validators['etag'],
+                               validators['last_modified'], page_total_pages)
+
+        if total_pages is None:
+            total_pages = page_total_pages or 1
+            logger.info(f"API reports {total_pages} pages of {rows_per_page} rows.")
+
+        if not page_pdf_infos:
+            logger.info(f"API page {page_num} contained no rows. Stopping API crawl.")
+            break
+        if known_docket_number is not None and page_is_known(page_pdf_infos, store):
+            logger.info(f"API page {page_num} only lists known entries (up to DN {known_docket_number}). Stopping incremental crawl.")
+            break
+        metrics.incr('pages')
+        metrics.incr('rows', len(page_pdf_infos))
+        merge_new_pdf_infos(page_pdf_infos, store, page_num, on_new_links)
+        page_num += 1
+
+def hash_file(path):
+    """Returns (size_in_bytes, sha256_hexdigest) for a file."""
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+            size += len(chunk)
+    return size, sha256.hexdigest()
+
+class DownloadManifest:
+    """Records every finished download (path, size, SHA-256, timestamp) keyed by docket URL.
+
+    Lives in its own table of the links database so resuming is a lookup instead of a stat
+    per file, and `verify` can spot files that were truncated or changed after download.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS downloads ("
+                "url TEXT PRIMARY KEY, path TEXT NOT NULL, size INTEGER NOT NULL, "
+                "sha256 TEXT NOT NULL, downloaded_at TEXT NOT NULL)"
+            )
+
+    def get(self, url):
+        """Returns the manifest entry for `url` as a dict, or None if it was never downloaded."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT url, path, size, sha256, downloaded_at FROM downloads WHERE url = ?", (url,)
+            ).fetchone()
+        return dict(zip(('url', 'path', 'size', 'sha256', 'downloaded_at'), row)) if row else None
+
+    def record(self, url, path, size=None, sha256=None):
+        """Records a finished download, hashing the file unless size and digest are supplied."""
+        if size is None or sha256 is None:
+            size, sha256 = hash_file(path)
+        downloaded_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO downloads (url, path, size, sha256, downloaded_at) VALUES (?, ?, ?, ?, ?)",
+                (url, path, size, sha256, downloaded_at)
+            )
+
+    def remove(self, url):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM downloads WHERE url = ?", (url,))
+
+    def all(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT url, path, size, sha256, downloaded_at FROM downloads").fetchall()
+        return [dict(zip(('url', 'path', 'size', 'sha256', 'downloaded_at'), row)) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+def looks_like_complete_pdf(path):
+    """True when a file is non-empty, starts with a %PDF header and has a %%EOF trailer near its end.
+
+    Catches downloads that were cut off part way, which would otherwise hash fine.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(5) != b"%PDF-":
+                return False
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - PDF_TRAILER_WINDOW, 0))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
+def check_manifest_entry(entry):
+    """Re-hashes one manifest entry; returns a problem description, or None if the file is intact."""
+    if not os.path.exists(entry['path']):
+        return "missing"
+    if not looks_like_complete_pdf(entry['path']):
+        return "not a complete PDF"
+    size, sha256 = hash_file(entry['path'])
+    if size != entry['size']:
+        return f"size {size} != recorded {entry['size']}"
+    if sha256 != entry['sha256']:
+        return "sha256 mismatch"
+    return None
+
+def verify_downloads(manifest, workers=VERIFY_WORKERS):
+    """Re-hashes every file in the manifest in parallel and drops corrupt or missing entries.
+
+    Corrupt files are renamed to *.corrupt so the next run downloads them again instead of
+    adopting them back into the manifest. Returns the list of bad URLs.
+    """
+    entries = manifest.all()
+    logger.info(f"Verifying {len(entries)} downloaded files with {workers} workers...")
+    bad_urls = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for entry, problem in zip(entries, executor.map(check_manifest_entry, entries)):
+            if problem:
+                logger.warning(f"Corrupt or partial download ({problem}): {entry['path']}")
+                if os.path.exists(entry['path']):
+                    os.replace(entry['path'], entry['path'] + ".corrupt")
+                manifest.remove(entry['url'])
+                bad_urls.append(entry['url'])
+    logger.info(f"Verification finished: {len(entries) - len(bad_urls)} intact, {len(bad_urls)} queued for re-download.")
+    return bad_urls
+
+def already_downloaded(pdf_info, filepath, manifest):
+    """True when the PDF is recorded in the manifest, or found complete on disk and recorded now.
+
+    A file on disk that isn't a complete PDF (e.g. a download that was cut off) is renamed
+    to *.corrupt so it gets downloaded again.
+    """
+    if manifest is not None and manifest.get(pdf_info['url']) is not None:
+        return True
+    if not os.path.exists(filepath):
+        return False
+    if not looks_like_complete_pdf(filepath):
+        logger.warning(f"Found a partial or invalid PDF, downloading it again: {filepath}")
+        os.replace(filepath, filepath + ".corrupt")
+        return False
+    # Files downloaded before the manifest existed are hashed once and adopted
+    if manifest is not None:
+        manifest.record(pdf_info['url'], filepath)
+    return True
+
+def extract_pdf_text(path):
+    """Returns the text of every page of a PDF joined by blank lines.
+
+    Runs in a worker process, so it only takes and returns plain values. Scanned PDFs
+    without a text layer come back as an empty string.
+    """
+    reader = PdfReader(path)
+    return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+
+def _extract_pdf_text_worker(path):
+    """Process pool entry point: returns (text, error) so one bad PDF doesn't stop the pool."""
+    try:
+        return extract_pdf_text(path), None
+    except Exception as e:
+        return None, str(e)
+
+class TextIndex:
+    """SQLite FTS5 index of the text of downloaded PDFs, searchable by docket number, date and title.
+
+    Lives next to the link and download tables. `indexed_files` remembers the SHA-256 each
+    file had when it was indexed, so only new or re-downloaded files are extracted again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS doc_text USING fts5("
+                "docket_number, date, title, body, url UNINDEXED, tokenize='porter unicode61')"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS indexed_files ("
+                "url TEXT PRIMARY KEY, docid INTEGER NOT NULL, sha256 TEXT NOT NULL, indexed_at TEXT NOT NULL)"
+            )
+
+    def indexed_hashes(self):
+        """Returns {url: sha256} for every file currently in the index."""
+        with self.lock:
+            return dict(self.conn.execute("SELECT url, sha256 FROM indexed_files").fetchall())
+
+    def add(self, pdf_info, sha256, text):
+        """Indexes (or re-indexes) the text of one downloaded PDF."""
+        indexed_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT docid FROM indexed_files WHERE url = ?", (pdf_info['url'],)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM doc_text WHERE rowid = ?", (row[0],))
+            cursor = self.conn.execute(
+                "INSERT INTO doc_text (docket_number, date, title, body, url) VALUES (?, ?, ?, ?, ?)",
+                (pdf_info.get('docket_number', ''), pdf_info.get('date', ''), pdf_info.get('title', ''), text, pdf_info['url'])
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO indexed_files (url, docid, sha256, indexed_at) VALUES (?, ?, ?, ?)",
+                (pdf_info['url'], cursor.lastrowid, sha256, indexed_at)
+            )
+
+    def search(self, query, limit=SEARCH_RESULTS):
+        """Returns up to `limit` hits for an FTS5 query, best first.
+
+        Matches in the title count ten times as much as matches in the body. Each hit is a
+        dict with docket_number, date, title, url, a highlighted snippet and its bm25 rank.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT docket_number, date, title, url, snippet(doc_text, 3, '[', ']', ' ... ', 12), "
+                "bm25(doc_text, 5.0, 1.0, 10.0, 1.0, 0.0) AS rank "
+                "FROM doc_text WHERE doc_text MATCH ? ORDER BY rank LIMIT ?",
+                (query, limit)
+            ).fetchall()
+        return [dict(zip(('docket_number', 'date', 'title', 'url', 'snippet', 'rank'), row)) for row in rows]
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM indexed_files").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+def index_downloaded_text(store, manifest, text_index, workers=TEXT_INDEX_WORKERS):
+    """Extracts the text of new or changed downloads in a process pool and adds it to `text_index`.
+
+    A file is (re-)indexed when its manifest SHA-256 differs from the one it was indexed
+    with; unreadable files get an empty body so only their title is searchable. Returns
+    the number of files indexed.
+    """
+    if PdfReader is None:
+        logger.warning("pypdf is not installed; skipping the full-text index. Install it with: pip install pypdf")
+        return 0
+    indexed = text_index.indexed_hashes()
+    pending = [entry for entry in manifest.all() if indexed.get(entry['url']) != entry['sha256']]
+    if not pending:
+        logger.info(f"Full-text index is up to date ({len(indexed)} files).")
+        return 0
+
+    pdf_infos = {info['url']: info for info in store.all()}
+    logger.info(f"Extracting text from {len(pending)} new or changed PDFs with {workers} processes...")
+    indexed_count = 0
+    with metrics.timer('text_extraction'), ProcessPoolExecutor(max_workers=workers) as executor:
+        paths = [entry['path'] for entry in pending]
+        for entry, (text, error) in zip(pending, executor.map(_extract_pdf_text_worker, paths, chunksize=8)):
+            if error is not None:
+                # Indexed with an empty body so the file isn't retried until it changes
+                logger.warning(f"Could not extract text from {entry['path']}: {error}")
+                metrics.incr('text_extraction_failures')
+                text = ""
+            elif not text.strip():
+                logger.debug(f"No text layer in {entry['path']}; indexing its title only.")
+            text_index.add(pdf_infos.get(entry['url'], {'url': entry['url']}), entry['sha256'], text)
+            indexed_count += 1
+    metrics.incr('texts_indexed', indexed_count)
+    logger.info(f"Indexed the text of {indexed_count} PDFs; {len(text_index)} files searchable.")
+    return indexed_count
+
+def search_text_index(text_index, query, limit=SEARCH_RESULTS):
+    """Runs a full-text query and returns (hits, elapsed_seconds); bad query syntax logs an error."""
+    started = time.perf_counter()
+    try:
+        hits = text_index.search(query, limit)
+    except sqlite3.OperationalError as e:
+        logger.error(f"Invalid search query {query!r}: {e}")
+        hits = []
+    return hits, time.perf_counter() - started
+
+def pdf_file_stem(pdf_info):
+    """The sanitized file name of an entry without extension.
+
+    Entries indexed by older versions carry a ".pdf" in their filename_suggestion already;
+    it is dropped so the file doesn't end up as "<name>.pdf.pdf".
+    """
+    stem = pdf_info.get('filename_suggestion') or 'untitled_document'
+    if stem.lower().endswith('.pdf'):
+        stem = stem[:-4].rstrip('._ ') or 'untitled_document'
+    return stem
+
+class FilenameAllocator:
+    """Hands out a unique PDF file name per docket URL within one download directory.
+
+    Names already used are kept in memory (case-insensitively, as on Windows), seeded from
+    the manifest so files downloaded earlier keep their names. When two entries would share
+    a name, the later one gets a hash of its URL appended, so the result is the same on
+    every run as long as entries are allocated in the same order. An entry the manifest
+    doesn't know keeps the name older versions saved it under ("<filename_suggestion>.pdf")
+    when that file is on disk, so already_downloaded can adopt it instead of fetching a copy.
+    """
+
+    def __init__(self, directory, manifest=None):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.by_url = {}
+        self.used = {}
+        self.on_disk = {name.casefold() for name in os.listdir(directory)} if os.path.isdir(directory) else set()
+        if manifest is not None:
+            for entry in manifest.all():
+                if os.path.dirname(entry['path']) == directory:
+                    name = os.path.basename(entry['path'])
+                    self.by_url[entry['url']] = name
+                    self.used[name.casefold()] = entry['url']
+
+    def allocate(self, pdf_info):
+        """Returns the output path for `pdf_info`, reserving its name."""
+        url = pdf_info['url']
+        with self.lock:
+            name = self.by_url.get(url)
+            if name is None:
+                stem = pdf_file_stem(pdf_info)
+                name = stem + ".pdf"
+                legacy_name = (pdf_info.get('filename_suggestion') or 'untitled_document') + ".pdf"
+                if legacy_name.casefold() in self.on_disk and self.used.get(legacy_name.casefold(), url) == url:
+                    name = legacy_name
+                elif self.used.get(name.casefold(), url) != url:
+                    stem = stem[:FILENAME_MAX_LENGTH - FILENAME_HASH_LENGTH - 1].rstrip('._ ')
+                    name = f"{stem}-{short_hash(url)}.pdf"
+                    attempt = 1
+                    while self.used.get(name.casefold(), url) != url:
+                        name = f"{stem}-{short_hash(url)}-{attempt}.pdf"
+                        attempt += 1
+                self.by_url[url] = name
+                self.used[name.casefold()] = url
+        return os.path.join(self.directory, name)
+
+    def allocate_all(self, pdf_infos):
+        """Plans the output paths of many entries at once, in the given order."""
+        return [self.allocate(info) for info in pdf_infos]
+
+# One allocator per download directory, shared by every worker writing into it
+filename_allocators = {}
+filename_allocators_lock = threading.Lock()
+
+def filename_allocator(directory, manifest=None):
+    """Returns the FilenameAllocator for `directory`, creating it on first use."""
+    with filename_allocators_lock:
+        allocator = filename_allocators.get(directory)
+        if allocator is None:
+            allocator = filename_allocators[directory] = FilenameAllocator(directory, manifest)
+        return allocator
+
+class _DownloadEventHandler(FileSystemEventHandler if FileSystemEventHandler else object):
+    """Wakes a DownloadWatcher whenever something changes in the download directory."""
+
+    def __init__(self, changed):
+        self.changed = changed
+
+    def on_any_event(self, event):
+        self.changed.set()
+
+class DownloadWatcher:
+    """Waits for Chrome to finish saving one file into a download directory of its own.
+
+    Chrome names downloads after the server's Content-Disposition header, not after anything
+    the scraper can choose, so the watcher takes the first new file in `directory` to be the
+    download: `*.crdownload` (or `Unconfirmed *.crdownload`) while Chrome is writing it, then
+    the final name. The directory must belong to one browser, or another worker's file could
+    be picked up. When the optional `watchdog` package is installed, file system events wake
+    the watcher the moment Chrome renames the file; otherwise it polls quickly. Use it as a
+    context manager around the navigation that triggers the download.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.changed = threading.Event()
+        self.observer = None
+        self.existing = set()
+
+    def __enter__(self):
+        os.makedirs(self.directory, exist_ok=True)
+        # Files left by an attempt that timed out are removed; anything Chrome still holds open is ignored instead
+        for name in os.listdir(self.directory):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+        self.existing = set(os.listdir(self.directory))
+        if Observer is not None:
+            self.observer = Observer()
+            self.observer.schedule(_DownloadEventHandler(self.changed), self.directory, recursive=False)
+            self.observer.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+
+    def _new_files(self):
+        """Returns (finished_paths, partial_paths) for files that appeared since the watcher started."""
+        finished = []
+        partials = []
+        for name in os.listdir(self.directory):
+            # Chrome also creates short-lived hidden temp files (".com.google.Chrome.*") on Linux and macOS
+            if name in self.existing or name.startswith('.'):
+                continue
+            path = os.path.join(self.directory, name)
+            (partials if name.endswith(".crdownload") else finished).append(path)
+        return finished, partials
+
+    def wait(self, start_timeout=DOWNLOAD_START_TIMEOUT, stall_timeout=DOWNLOAD_STALL_TIMEOUT):
+        """Blocks until Chrome has finished a file and returns its path.
+
+        Returns None if Chrome hasn't started a download within `start_timeout` seconds or
+        the partial file stops growing for `stall_timeout` seconds.
+        """
+        interval = 1.0 if self.observer is not None else DOWNLOAD_POLL_INTERVAL
+        started = False
+        last_size = -1
+        last_progress = time.monotonic()
+        while True:
+            finished, partials = self._new_files()
+            if finished:
+                return finished[0]
+
+            now = time.monotonic()
+            if partials:
+                started = True
+                try:
+                    size = os.path.getsize(partials[0])
+                except OSError:
+                    size = last_size # renamed between the checks; the next pass sees the final file
+                if size != last_size:
+                    logger.debug(f"Downloading {os.path.basename(partials[0])}: {size} bytes so far")
+                    last_size = size
+                    last_progress = now
+
+            if not started and now - last_progress > start_timeout:
+                logger.warning(f"No download started in {self.directory} (waited {start_timeout}s).")
+                return None
+            if started and now - last_progress > stall_timeout:
+                logger.warning(f"Download in {self.directory} stalled at {last_size} bytes for {stall_timeout}s.")
+                return None
+
+            self.changed.wait(interval)
+            self.changed.clear()
+
+def browser_download_dir(directory, driver):
+    """The folder inside `directory` that one browser saves its downloads into before they are renamed."""
+    return os.path.join(directory, BROWSER_DOWNLOAD_SUBDIR, driver.session_id)
+
+# Track which WebDriver sessions have already had the CAPTCHA solved manually during this run.
+# Each browser in the download pool has its own cookies, so the CAPTCHA is tracked per session.
+captcha_solved_sessions = set()
+# Only one worker may prompt on the console at a time
+captcha_lock = threading.Lock()
+
+
+def download_pdf(driver, pdf_info, directory, manifest=None, interactive=True):
+    """Downloads a single PDF from the given pdf_info to the specified directory.
+
+    Without `interactive` (headless runs) a CAPTCHA that hasn't been solved returns
+    CAPTCHA_BLOCKED instead of prompting on the console.
+    """
+    pdf_url = pdf_info['url']
+
+    try:
+        filepath = filename_allocator(directory, manifest).allocate(pdf_info)
+        filename = os.path.basename(filepath)
+        if already_downloaded(pdf_info, filepath, manifest):
+            logger.info(f"File already downloaded, skipping: {filepath}")
+            metrics.incr('skips')
+            return True
+
+        with DownloadWatcher(browser_download_dir(directory, driver)) as watcher:
+            set_download_directory(driver, watcher.directory)
+            logger.info(f"Attempting to navigate to PDF URL via Selenium: {pdf_url}")
+            with metrics.timer('download_navigation'):
+                driver.get(pdf_url)
+
+            page_source = driver.page_source.lower()
+            captcha_present = 'captcha' in page_source
+            captcha_solved = driver.session_id in captcha_solved_sessions
+
+            if captcha_present and not captcha_solved and not interactive:
+                logger.warning(f"CAPTCHA required for {pdf_url} but no one can solve it in headless mode. Skipping.")
+                return CAPTCHA_BLOCKED
+            elif captcha_present and not captcha_solved:
+                with captcha_lock:
+                    print("\n--- HUMAN INTERVENTION REQUIRED ---")
+                    print(
+                        f"Navigated to: {pdf_url} (for docket item: {pdf_info.get('docket_number', 'N/A')}, title: {pdf_info.get('title', 'N/A')})"
+                    )
+                    print("Please solve the CAPTCHA in the Selenium browser window.")
+                    print(
+                        f"The PDF should then download automatically; it will be saved to {directory} as {filename}"
+                    )
+                    metrics.incr('captchas')
+                    with metrics.timer('captcha_wait'):
+                        input("Press Enter here AFTER the CAPTCHA is solved and the PDF is saved...")
+                    captcha_solved_sessions.add(driver.session_id)
+            elif captcha_present and captcha_solved:
                 logger.info("CAPTCHA text detected but already solved earlier; proceeding without prompt.")
             else:
-                logger.info("No CAPTCHA detected. Waiting briefly for automatic download...")
-            time.sleep(2)
+                logger.info("No CAPTCHA detected. Waiting for automatic download...")
 
-        # Verify the file exists after either automatic download or manual step
-        wait_time = 0
-        while wait_time < 30 and not os.path.exists(filepath):
-            time.sleep(1)
-            wait_time += 1
+            # Returns as soon as Chrome renames the finished download into place
+            with metrics.timer('file_wait'):
+                saved_path = watcher.wait()
 
-        if os.path.exists(filepath):
-            logger.info(f"Confirmed download of {filename_suggestion_base}.pdf to {filepath}")
-            return True
-        else:
+        if saved_path is None:
+            logger.warning(f"Chrome did not save a file for {pdf_url}.")
+            return False
+        if not looks_like_complete_pdf(saved_path):
             logger.warning(
-                f"Expected file {filename_suggestion_base}.pdf not found at {filepath}."
+                f"Chrome saved {os.path.basename(saved_path)} for {pdf_url} but it is not a complete PDF; moving it to {filename}.corrupt."
             )
+            os.replace(saved_path, filepath + ".corrupt")
             return False
+        os.replace(saved_path, filepath)
+        logger.info(f"Confirmed download of {filename} to {filepath} (saved by Chrome as {os.path.basename(saved_path)})")
+        metrics.incr('bytes', os.path.getsize(filepath))
+        if manifest is not None:
+            manifest.record(pdf_url, filepath)
+        return True
 
     except Exception as e:
         logger.error(f"An unexpected error occurred while downloading {pdf_url}: {e}")
         return False
 
-def extract_pdf_infos_from_selenium_page(driver):
-    """Extracts PDF information from the current page loaded in Selenium WebDriver."""
+def download_pdf_via_http(session, pdf_info, directory, manifest=None, rate_limiter=None):
+    """Streams a single PDF with requests, writing to a temp file that is renamed into place.
+
+    Returns True when the file was saved (or already existed), False on failure,
+    DOCUMENT_MISSING on HTTP 404/410, CAPTCHA_BLOCKED when the server answered with a
+    CAPTCHA page, and None for any other HTML page or HTTP 4xx; in the last two cases the
+    caller should fall back to Chrome. Response times, HTTP 429/5xx answers and network
+    errors are reported to `rate_limiter`. Other 4xx answers and CAPTCHA pages aren't: they
+    are about this document or this session, not a sign that the server is under strain.
+    """
+    pdf_url = pdf_info['url']
+    filepath = filename_allocator(directory, manifest).allocate(pdf_info)
+    if already_downloaded(pdf_info, filepath, manifest):
+        logger.info(f"File already downloaded, skipping: {filepath}")
+        metrics.incr('skips')
+        return True
+
+    temp_path = filepath + ".part"
+    try:
+        logger.info(f"Fetching PDF over HTTP: {pdf_url}")
+        started = time.monotonic()
+        with session.get(pdf_url, stream=True, timeout=(10, 60)) as response:
+            if response.status_code == 429 or response.status_code >= 500:
+                if rate_limiter is not None:
+                    rate_limiter.record_failure(pdf_url, f"HTTP {response.status_code}", retry_after_seconds(response))
+                logger.error(f"HTTP {response.status_code} for {pdf_url}.")
+                return False
+            if response.status_code in (404, 410):
+                logger.error(f"HTTP {response.status_code} for {pdf_url}; the document isn't there, so it won't be retried.")
+                return DOCUMENT_MISSING
+            if response.status_code >= 400:
+                logger.warning(f"HTTP {response.status_code} for {pdf_url}; falling back to the browser.")
+                return None
+            response.raise_for_status()
+            content_type = response.headers.get('Content-Type', '').lower()
+            if 'html' in content_type:
+                if 'captcha' in response.text.lower():
+                    logger.info(f"CAPTCHA page returned for {pdf_url}; it needs the browser.")
+                    metrics.incr('captcha_pages')
+                    return CAPTCHA_BLOCKED
+                logger.warning(f"Expected a PDF but got {content_type} for {pdf_url}; falling back to the browser.")
+                return None
+
+            if rate_limiter is not None:
+                rate_limiter.record_success(pdf_url, time.monotonic() - started)
+            bytes_written = 0
+            sha256 = hashlib.sha256()
+            with open(temp_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    sha256.update(chunk)
+                    bytes_written += len(chunk)
+        if not looks_like_complete_pdf(temp_path):
+            logger.error(f"Incomplete PDF from {pdf_url} ({bytes_written} bytes); discarding it.")
+            os.remove(temp_path)
+            return False
+        os.replace(temp_path, filepath)
+        metrics.observe('http_download', time.monotonic() - started)
+        metrics.incr('bytes', bytes_written)
+        if manifest is not None:
+            manifest.record(pdf_url, filepath, bytes_written, sha256.hexdigest())
+        logger.info(f"Downloaded {os.path.basename(filepath)} ({bytes_written} bytes) to {filepath}")
+        return True
+
+    except Exception as e:
+        logger.error(f"HTTP download failed for {pdf_url}: {e}")
+        if rate_limiter is not None and isinstance(e, requests.exceptions.RequestException):
+            rate_limiter.record_failure(pdf_url, e.__class__.__name__)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` acquisitions per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available, then consumes it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hands out no tokens for the next `seconds` seconds."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+            self.updated = self.paused_until
+
+class HostRateLimiter:
+    """Keeps one shared TokenBucket per host so every worker hitting a host draws from the same budget.
+
+    The bucket's rate adapts to how the host responds. Quick responses raise it step by step
+    up to `max_rate`, responses much slower than the running average lower it, and errors
+    (HTTP 4xx/5xx, timeouts) halve it and pause the host with exponential backoff, or for
+    as long as the server's Retry-After asks.
+    """
+
+    def __init__(self, max_rate, capacity=1, min_rate=None, initial_rate=None):
+        self.max_rate = max_rate
+        self.min_rate = min_rate or max_rate / 16
+        self.initial_rate = initial_rate or max_rate / 2
+        self.capacity = capacity
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def _host(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is None:
+                state = self.hosts[host] = {
+                    'bucket': TokenBucket(self.initial_rate, self.capacity),
+                    'latency': None,
+                    'failures': 0,
+                }
+        return state
+
+    def wait(self, url):
+        """Blocks until a request to the host of `url` is allowed."""
+        self._host(url)['bucket'].acquire()
+
+    def record_success(self, url, elapsed):
+        """Feeds a successful response time back into the host's pacing."""
+        state = self._host(url)
+        bucket = state['bucket']
+        with self.lock:
+            state['failures'] = 0
+            average = state['latency']
+            state['latency'] = elapsed if average is None else (1 - LATENCY_SMOOTHING) * average + LATENCY_SMOOTHING * elapsed
+            if average is not None and elapsed > SLOW_RESPONSE_FACTOR * average:
+                bucket.rate = max(self.min_rate, bucket.rate * 0.75)
+            else:
+                bucket.rate = min(self.max_rate, bucket.rate + self.max_rate / 10)
+
+    def record_failure(self, url, reason, retry_after=None):
+        """Backs the host off exponentially (or for `retry_after` seconds) after an error."""
+        state = self._host(url)
+        bucket = state['bucket']
+        with self.lock:
+            state['failures'] += 1
+            bucket.rate = max(self.min_rate, bucket.rate / 2)
+            if retry_after is None:
+                backoff = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (state['failures'] - 1))
+                retry_after = backoff * random.uniform(0.8, 1.2)
+        logger.warning(
+            f"{reason} from {urlparse(url).netloc}; backing off {retry_after:.1f}s (rate now {bucket.rate:.3f}/s)."
+        )
+        bucket.pause(retry_after)
+
+def retry_after_seconds(response):
+    """Returns the Retry-After header of a response in seconds, if it gives a number."""
+    value = response.headers.get('Retry-After', '')
+    return float(value) if value.strip().isdigit() else None
+
+def _download_one(pdf_info, driver, session, directory, rate_limiter, manifest, interactive):
+    """Downloads one PDF over HTTP when possible, falling back to the worker's browser.
+
+    Files that are already downloaded are skipped before a rate-limiter token is taken, so
+    resuming a finished docket costs manifest lookups only. Returns True, False,
+    DOCUMENT_MISSING when the server says the document doesn't exist, or CAPTCHA_BLOCKED
+    when a CAPTCHA page stands in the way and this worker has no browser.
+    """
+    filepath = filename_allocator(directory, manifest).allocate(pdf_info)
+    if already_downloaded(pdf_info, filepath, manifest):
+        logger.info(f"File already downloaded, skipping: {filepath}")
+        metrics.incr('skips')
+        return True
+    rate_limiter.wait(pdf_info['url'])
+    if session is not None:
+        result = download_pdf_via_http(session, pdf_info, directory, manifest, rate_limiter)
+        if result is True or result is False or result is DOCUMENT_MISSING:
+            return result
+        if driver is None:
+            logger.warning(f"No browser available to fall back to for {pdf_info['url']}.")
+            return result if result is CAPTCHA_BLOCKED else False
+        # The browser's request is a second one to the host
+        rate_limiter.wait(pdf_info['url'])
+    elif driver is None:
+        logger.warning(f"No browser available to fall back to for {pdf_info['url']}.")
+        return False
+    prompted = driver.session_id not in captcha_solved_sessions
+    started = time.monotonic()
+    ok = download_pdf(driver, pdf_info, directory, manifest, interactive)
+    # Time spent waiting on a person to solve the CAPTCHA says nothing about the server
+    prompted = prompted and driver.session_id in captcha_solved_sessions
+    if ok is True and not prompted:
+        rate_limiter.record_success(pdf_info['url'], time.monotonic() - started)
+    if session is not None and driver.session_id in captcha_solved_sessions:
+        copy_driver_cookies(driver, session)
+    return ok
+
+def download_from_queue(work_queue, drivers, directory, rate_limiter, use_http=True, manifest=None, interactive=True, session=None):
+    """Runs one download worker thread per WebDriver in `drivers`, pulling pdf_infos from `work_queue`.
+
+    Each worker stops when it takes a None sentinel off the queue, so the producer must put
+    one None per driver once it is done. A None entry in `drivers` makes an HTTP-only worker
+    with no browser fallback.
+
+    With `use_http` each worker streams PDFs through its own requests.Session and only
+    drives its browser when the server returns a CAPTCHA page. Once the CAPTCHA has been
+    solved in that browser its cookies are copied into the session so later files go over
+    HTTP again. Passing `session` makes every worker share that session's connection pool
+    instead; browser workers still keep their own cookies, and HTTP-only workers use
+    `session` itself. Returns a (downloaded_count, failed_pdf_infos, captcha_blocked_pdf_infos,
+    missing_count) tuple. Only failed_pdf_infos are worth retrying: captcha_blocked_pdf_infos
+    were stopped by a CAPTCHA that the worker had no browser or no person to solve, and
+    missing_count counts documents the server answered with 404/410.
+    """
+    results_lock = threading.Lock()
+    downloaded = [0]
+    missing = [0]
+    failed = []
+    captcha_blocked = []
+
+    def worker(driver):
+        try:
+            if not use_http:
+                worker_session = None
+            elif session is not None and driver is None:
+                worker_session = session
+            elif session is not None:
+                # This browser's cookies go in a jar of their own, on the shared connection pool
+                worker_session = create_http_session(driver, adapter=session.get_adapter("https://"))
+            else:
+                worker_session = create_http_session(driver)
+            ready = True
+        except Exception as e:
+            # Usually a browser that has died. The worker keeps taking items off the queue and
+            # failing them, so a producer blocked on a full queue can't hang the pipeline.
+            logger.error(f"Download worker could not start, failing its items: {e}")
+            ready = False
+
+        while True:
+            pdf_info = work_queue.get()
+            if pdf_info is None:
+                return
+            try:
+                ok = ready and _download_one(pdf_info, driver, worker_session, directory, rate_limiter, manifest, interactive)
+            except Exception as e:
+                logger.error(f"Download worker error for {pdf_info['url']}: {e}")
+                ok = False
+            with results_lock:
+                if ok is CAPTCHA_BLOCKED:
+                    metrics.incr('captcha_blocked')
+                    captcha_blocked.append(pdf_info)
+                elif ok is DOCUMENT_MISSING:
+                    metrics.incr('download_failures')
+                    missing[0] += 1
+                elif ok:
+                    downloaded[0] += 1
+                else:
+                    metrics.incr('download_failures')
+                    failed.append(pdf_info)
+
+    threads = [threading.Thread(target=worker, args=(driver,), daemon=True) for driver in drivers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return downloaded[0], failed, captcha_blocked, missing[0]
+
+def download_all(pdf_infos, drivers, directory, rate_limiter, use_http=True, manifest=None, interactive=True, session=None,
+                 retry_rounds=DOWNLOAD_RETRY_ROUNDS):
+    """Downloads every pdf_info using one worker thread per WebDriver in `drivers`.
+
+    See download_from_queue for how workers use their browser and HTTP session. Failed items
+    go back on a retry queue for up to `retry_rounds` more passes; the rate limiter's backoff
+    spaces the retries out. CAPTCHA-blocked items aren't retried, since the same workers
+    would hit the same CAPTCHA, and neither are documents the server reports missing; the
+    latter count as failed. Returns a (downloaded_count, failed_count, captcha_blocked_count)
+    tuple.
+    """
+    pending = list(pdf_infos)
+    # Reserve every output name up front so colliding titles are resolved in index order
+    filename_allocator(directory, manifest).allocate_all(pending)
+    downloaded_count = 0
+    missing_count = 0
+    captcha_blocked_count = 0
+    for round_num in range(retry_rounds + 1):
+        if not pending:
+            break
+        if round_num:
+            metrics.incr('retries', len(pending))
+            logger.info(f"Retrying {len(pending)} failed downloads (retry round {round_num} of {retry_rounds})...")
+        work_queue = queue.Queue()
+        for pdf_info in pending:
+            work_queue.put(pdf_info)
+        for _ in drivers:
+            work_queue.put(None)
+        downloaded, pending, captcha_blocked, missing = download_from_queue(
+            work_queue, drivers, directory, rate_limiter, use_http, manifest, interactive, session
+        )
+        downloaded_count += downloaded
+        missing_count += missing
+        captcha_blocked_count += len(captcha_blocked)
+    if captcha_blocked_count:
+        logger.warning(
+            f"{captcha_blocked_count} downloads were blocked by a CAPTCHA that no browser here could solve."
+        )
+    return downloaded_count, len(pending) + missing_count, captcha_blocked_count
+
+def crawl_and_download(crawl, store, drivers, crawl_driver, directory, rate_limiter, use_http=True,
+                       manifest=None, interactive=True, session=None):
+    """Overlaps index crawling with downloading through a bounded queue.
+
+    `crawl` is called in a producer thread with an `on_new_links` callback that it must hand
+    to merge_new_pdf_infos; every newly indexed link is queued for download right away, and
+    the crawler blocks while the queue is full. Once the crawl ends, links that were indexed
+    on earlier runs are queued too. Browsers other than `crawl_driver` download while the
+    crawl runs (an HTTP-only worker stands in if there are none, using `session` with the
+    crawl browser's cookies); items that fail there are
+    retried afterwards with every browser, and so are CAPTCHA pages the stand-in had no
+    browser for when someone is at the console to solve them.
+    When browser-only downloads have no spare browser, nothing can overlap, so the crawl
+    finishes before the downloads start.
+    Returns a (downloaded_count, failed_count, captcha_blocked_count) tuple.
+    """
+    download_drivers = [driver for driver in drivers if crawl_driver is None or driver is not crawl_driver]
+    if not download_drivers and not use_http:
+        # A worker with neither HTTP nor a browser could only fail, so crawl and download one after the other
+        logger.info("No browser is free to download while the crawl runs; crawling the whole index first.")
+        crawl()
+        return download_all(load_scraped_links(store), drivers, directory, rate_limiter, use_http, manifest,
+                            interactive, session)
+    download_drivers = download_drivers or [None]
+    if use_http and session is not None and drivers:
+        # The HTTP-only stand-in has no browser of its own to take the solved-CAPTCHA cookies from
+        try:
+            copy_driver_cookies(crawl_driver or drivers[0], session)
+        except Exception as e:
+            logger.error(f"Could not copy the browser's cookies for HTTP downloads: {e}")
+    work_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    queued_keys = set()
+
+    allocator = filename_allocator(directory, manifest)
+
+    def enqueue(pdf_infos):
+        for pdf_info in pdf_infos:
+            key = DocketEntry.from_info(pdf_info).key
+            if key not in queued_keys:
+                queued_keys.add(key)
+                allocator.allocate(pdf_info)
+                work_queue.put(pdf_info)
+
+    def produce():
+        try:
+            crawl(enqueue)
+        except Exception as e:
+            logger.error(f"Index crawl failed: {e}")
+        try:
+            if use_http and session is not None and crawl_driver is not None:
+                # Pick up anything that changed in the crawl browser, such as a CAPTCHA solved there
+                copy_driver_cookies(crawl_driver, session)
+            enqueue(load_scraped_links(store))
+        except Exception as e:
+            logger.error(f"Queueing previously indexed links failed: {e}")
+        finally:
+            for _ in download_drivers:
+                work_queue.put(None)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    downloaded_count, failed, captcha_blocked, missing_count = download_from_queue(
+        work_queue, download_drivers, directory, rate_limiter, use_http, manifest, interactive, session
+    )
+    producer.join()
+
+    if interactive:
+        # The crawling browser can take the CAPTCHA pages now, with someone there to solve it
+        failed += captcha_blocked
+        captcha_blocked = []
+    if failed:
+        # The crawling browser is free now, so every browser takes part in the retries
+        logger.info(f"Retrying {len(failed)} failed downloads with all browsers...")
+        retried, failed_count, retry_captcha_blocked = download_all(
+            failed, drivers, directory, rate_limiter, use_http, manifest, interactive, session,
+            retry_rounds=DOWNLOAD_RETRY_ROUNDS - 1
+        )
+        metrics.incr('retries', len(failed))
+        downloaded_count += retried
+        return downloaded_count, missing_count + failed_count, len(captcha_blocked) + retry_captcha_blocked
+    return downloaded_count, missing_count, len(captcha_blocked)
+
+def build_pdf_info(absolute_url, docket_number, title, date_str):
+    """Builds the DocketEntry stored in the link index for a single docket row."""
+    # Sanitize for filename; the ".pdf" extension is added when the output path is allocated
+    filename_suggestion = sanitize_filename(f"{date_str} - DN {docket_number} - {title}")
+    return DocketEntry(absolute_url, docket_number, title, date_str, filename_suggestion)
+
+def _cell_text(tag):
+    """Collapses whitespace the same way Selenium's WebElement.text does."""
+    return " ".join(tag.get_text().split())
+
+def parse_pdf_infos_from_html(table_html, page_url):
+    """Parses PDF information from a snapshot of the docket table's HTML.
+
+    Mirrors the per-row XPaths used by the WebDriver extraction (td[1] docket
+    number, td[2]/span/p/a link and title, td[3] date) but runs entirely
+    in-process, so no WebDriver round trips are made per row.
+    """
+    pdf_infos = []
+    soup = BeautifulSoup(table_html, 'html.parser')
+    table = soup.find('table')
+    if table is None:
+        logger.warning("No table found in docket table HTML snapshot.")
+        return pdf_infos
+
+    tbody = table.find('tbody', recursive=False)
+    rows = (tbody or table).find_all('tr', recursive=False)
+    for row in rows:
+        cells = row.find_all('td', recursive=False)
+        link_tag = cells[1].select_one('span > p > a') if len(cells) >= 3 else None
+        if link_tag is None or not link_tag.get('href'):
+            logger.warning("Could not find all expected elements in a row. Skipping row.")
+            continue
+
+        # WebElement.get_attribute('href') returns the resolved URL, so do the same here
+        absolute_url = urljoin(page_url, link_tag['href'])
+        pdf_infos.append(build_pdf_info(
+            absolute_url,
+            _cell_text(cells[0]),
+            _cell_text(link_tag),
+            _cell_text(cells[2]),
+        ))
+    return pdf_infos
+
+def extract_pdf_infos_from_selenium_page(driver, snapshot=True, page_cache=None, page_key=None):
+    """Extracts PDF information from the current page loaded in Selenium WebDriver.
+
+    With ``snapshot`` enabled (the default) the table's outerHTML is fetched once
+    and parsed with BeautifulSoup. Otherwise every cell is read through its own
+    WebDriver call, which is much slower but kept as a fallback. With a `page_cache`,
+    a snapshot that hashes the same as the one cached under `page_key` isn't parsed again.
+    """
+    with metrics.timer('row_extraction'):
+        pdf_infos = _extract_pdf_infos_from_selenium_page(driver, snapshot, page_cache, page_key)
+    metrics.incr('rows', len(pdf_infos))
+    return pdf_infos
+
+def _extract_pdf_infos_from_selenium_page(driver, snapshot=True, page_cache=None, page_key=None):
+    """Does the work of extract_pdf_infos_from_selenium_page, without the timing."""
     pdf_infos = []
     logger.info("Extracting PDF info from current Selenium page...")
     try:
-        # !!! Placeholder: Update these selectors based on actual page structure !!!
-        # Example: Find all rows in the docket table
-        # docket_table_rows = driver.find_elements(By.XPATH, "//table[@id='results-table']/tbody/tr")
-        # For a more robust wait:
         # Using the absolute XPath provided by the user for table rows
         docket_table_rows = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.XPATH, "/html/body/main/div[3]/div[2]/div[3]/div[2]/div[3]/div[4]/div[1]/table/tbody/tr"))
+            EC.presence_of_all_elements_located((By.XPATH, DOCKET_ROWS_XPATH))
         )
 
         if not docket_table_rows:
             logger.warning("No docket table rows found on the page with current selectors.")
             return []
 
+        if snapshot:
+            table_html = driver.find_element(By.XPATH, DOCKET_TABLE_XPATH).get_attribute('outerHTML')
+            if page_cache is not None:
+                content_hash = hashlib.sha256(table_html.encode('utf-8')).hexdigest()
+                cached_page = page_cache.get(page_key)
+                if cached_page is not None and cached_page['content_hash'] == content_hash:
+                    logger.info("Docket table is unchanged since the last crawl; using its cached rows.")
+                    metrics.incr('pages_unchanged')
+                    return cached_page['rows']
+            pdf_infos = parse_pdf_infos_from_html(table_html, driver.current_url)
+            if page_cache is not None:
+                page_cache.put(page_key, content_hash, pdf_infos)
+            logger.info(f"Extracted {len(pdf_infos)} non-CAPTCHA PDF links from Selenium page snapshot.")
+            return pdf_infos
+
         for row in docket_table_rows:
             try:
                 # --- Extract elements from the row --- 
@@ -300,22 +1703,13 @@ def extract_pdf_infos_from_selenium_page(driver):
                 href = link_tag.get_attribute('href')
                 # Ensure URL is absolute (CAPTCHA check moved to download_pdf)
                 absolute_url = urljoin(driver.current_url, href)
-                
-                docket_number = docket_num_element.text.strip()
-                title = link_tag.text.strip() # Title is the text of the link_tag
-                date_str = date_element.text.strip()
-
-                # Sanitize for filename
-                filename_suggestion = sanitize_filename(f"{date_str} - DN {docket_number} - {title}.pdf")
-
-                pdf_infos.append({
-                    'url': absolute_url,
-                    'docket_number': docket_number,
-                    'title': title,
-                    'date': date_str,
-                    'filename_suggestion': filename_suggestion,
-                    'original_href': href
-                })
+
+                pdf_infos.append(build_pdf_info(
+                    absolute_url,
+                    docket_num_element.text.strip(),
+                    link_tag.text.strip(), # Title is the text of the link_tag
+                    date_element.text.strip(),
+                ))
             except NoSuchElementException:
                 logger.warning("Could not find all expected elements in a row. Skipping row.")
                 continue # Skip this row if elements are missing
@@ -331,151 +1725,637 @@ def extract_pdf_infos_from_selenium_page(driver):
     logger.info(f"Extracted {len(pdf_infos)} non-CAPTCHA PDF links from Selenium page.")
     return pdf_infos
 
-def main():
-    """Main function to orchestrate the PDF downloading process using Selenium."""
-    create_download_directory(DOWNLOAD_DIR)
+def page_is_known(page_pdf_infos, store):
+    """True when every entry on a page was already indexed (by URL or by docket number).
 
-    # Load any previously collected links so the scraper can resume work
-    all_pdf_infos = load_scraped_links(LINKS_FILE)
-    seen_download_urls = set(info.get('url') for info in all_pdf_infos)
-    # current_page and total_pages were for API pagination, not directly used by Selenium in the same way
-    # Selenium pagination is handled by clicking 'Next' until no more pages.
+    Each entry is looked up in the store rather than compared with the highest known docket
+    number, so the gaps left by a crawl that stopped part way are filled in on the next run.
+    """
+    if not page_pdf_infos:
+        return False
+    for info in page_pdf_infos:
+        if store.has_url(info['url']) or store.has_docket_number(info.get('docket_number')):
+            continue
+        return False
+    return True
 
-    logger.info(f"Starting PDF scraping from Kroll Docket Page: {PAGE_URL}")
-    # create_download_directory is already called at the beginning of main.
-    # all_pdf_infos is already initialized.
-    
-    # Initialize WebDriver
-    driver = None
+def merge_new_pdf_infos(page_pdf_infos, store, page_num, on_new_links=None):
+    """Adds unseen links from one page to the link store and returns the new entries.
+
+    `on_new_links`, if given, is called with the new entries once they are saved.
+    """
+    with metrics.timer('index_save'):
+        new_infos = save_scraped_links(store, page_pdf_infos)
+    metrics.incr('new_links', len(new_infos))
+    if new_infos and on_new_links is not None:
+        on_new_links(new_infos)
+    if new_infos:
+        logger.info(
+            f"Found {len(new_infos)} new PDF links on page {page_num}. Total unique links so far: {len(store)}"
+        )
+    else:
+        logger.info(f"No new PDF links found on page {page_num}.")
+    return new_infos
+
+def row_replaced(row, old_text):
+    """True once a table row was removed from the DOM or re-rendered with different content."""
     try:
-        chrome_options = Options()
-        # Ensure DOWNLOAD_DIR is an absolute path for Chrome preferences
-        abs_download_dir = os.path.abspath(DOWNLOAD_DIR)
-        chrome_options.add_experimental_option("prefs", {
-          "download.default_directory": abs_download_dir,
-          "download.prompt_for_download": False,
-          "download.directory_upgrade": True,
-          "plugins.always_open_pdf_externally": True # Attempt to force download PDFs
-        })
-
-        if driver_path:
-            service = ChromeService(executable_path=driver_path)
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-        else:
-            # Assumes chromedriver is in PATH
-            driver = webdriver.Chrome(options=chrome_options) 
-        
-        logger.info(f"Navigating to {PAGE_URL} with Selenium...")
-        driver.get(PAGE_URL)
-        time.sleep(random.uniform(2,5)) # Initial wait for page to potentially load dynamic content
-
-        current_page_num = 1
-        while True:
-            logger.info(f"Processing page {current_page_num}...")
-            page_pdf_infos = extract_pdf_infos_from_selenium_page(driver)
-
-            new_infos = []
-            for info in page_pdf_infos:
-                if info['url'] not in seen_download_urls:
-                    new_infos.append(info)
-                    seen_download_urls.add(info['url'])
-
-            docket_1_present = any(info.get('docket_number') == '1' for info in page_pdf_infos)
-
-            if new_infos:
-                all_pdf_infos.extend(new_infos)
-                save_scraped_links(LINKS_FILE, all_pdf_infos)
-                logger.info(
-                    f"Found {len(new_infos)} new PDF links on page {current_page_num}. Total unique links so far: {len(all_pdf_infos)}"
-                )
-            else:
-                logger.info(f"No new PDF links found on page {current_page_num}.")
+        return row.text != old_text
+    except StaleElementReferenceException:
+        return True
 
-            if not new_infos and docket_1_present:
-                logger.info("Reached docket #1 with no new PDFs. Stopping pagination.")
-                break
+def crawl_index_with_selenium(driver, store, known_docket_number=None, rate_limiter=None, on_new_links=None,
+                              page_cache=None):
+    """Collects the docket index by clicking through the rendered pages with Selenium.
+
+    If `known_docket_number` is given (incremental mode), pagination stops at the first page
+    made up entirely of entries that are already indexed. Clicks are paced by `rate_limiter`,
+    and each page counts as loaded once the previous page's first row is gone or has changed.
+    Pages are rendered in the browser, so there is no request to make conditional; with a
+    `page_cache`, tables whose HTML is unchanged reuse their cached rows instead.
+    """
+    index_url = driver.current_url
+    current_page_num = 1
+    while True:
+        logger.info(f"Processing page {current_page_num}...")
+        page_pdf_infos = extract_pdf_infos_from_selenium_page(
+            driver, page_cache=page_cache, page_key=f"{index_url}#page={current_page_num}"
+        )
+        metrics.incr('pages')
+        if known_docket_number is not None and page_is_known(page_pdf_infos, store):
+            logger.info(f"Page {current_page_num} only lists known entries (up to DN {known_docket_number}). Stopping incremental crawl.")
+            break
+        new_infos = merge_new_pdf_infos(page_pdf_infos, store, current_page_num, on_new_links)
+
+        docket_1_present = any(parse_docket_number(info.get('docket_number')) == 1 for info in page_pdf_infos)
+        if not new_infos and docket_1_present:
+            logger.info("Reached docket #1 with no new PDFs. Stopping pagination.")
+            break
+
+        # --- Pagination: Find and click 'Next' button --- 
+        try:
+            next_button = WebDriverWait(driver, 5).until(
+                EC.element_to_be_clickable((By.XPATH, NEXT_BUTTON_XPATH)) # User-provided XPath
+            )
+            logger.info("Found 'Next Page' button. Clicking...")
+            driver.execute_script("arguments[0].scrollIntoView(true);", next_button) # Scroll to button
+            first_row = driver.find_element(By.XPATH, DOCKET_ROWS_XPATH)
+            first_row_text = first_row.text
+            if rate_limiter is not None:
+                rate_limiter.wait(driver.current_url)
+            started = time.monotonic()
+            driver.execute_script("arguments[0].click();", next_button) # JS click to bypass potential overlays
+            current_page_num += 1
+        except (TimeoutException, NoSuchElementException):
+            logger.info("No 'Next Page' button found or not clickable. Assuming end of pagination.")
+            break # Exit loop if no next page button
+        except Exception as e:
+            logger.error(f"Error clicking 'Next Page' button: {e}")
+            break
+
+        # Wait for the next page to replace the current rows instead of sleeping a fixed time
+        try:
+            WebDriverWait(driver, PAGE_LOAD_TIMEOUT).until(lambda d: row_replaced(first_row, first_row_text))
+            metrics.observe('page_load', time.monotonic() - started)
+            if rate_limiter is not None:
+                rate_limiter.record_success(driver.current_url, time.monotonic() - started)
+        except TimeoutException:
+            logger.warning(f"Page {current_page_num} did not replace the previous rows within {PAGE_LOAD_TIMEOUT}s.")
+            if rate_limiter is not None:
+                rate_limiter.record_failure(driver.current_url, "Page load timeout")
+
+def create_driver(download_dir, headless=False, profile_dir=None):
+    """Starts a Chrome WebDriver that saves PDFs straight into `download_dir`.
 
-            # --- Pagination: Find and click 'Next' button --- 
-            # !!! Placeholder: Update this selector for the 'Next Page' button !!!
+    `profile_dir` points Chrome at a persistent user data directory so cookies (including a
+    solved CAPTCHA) survive between runs.
+    """
+    chrome_options = Options()
+    # Ensure the download directory is an absolute path for Chrome preferences
+    abs_download_dir = os.path.abspath(download_dir)
+    chrome_options.add_experimental_option("prefs", {
+      "download.default_directory": abs_download_dir,
+      "download.prompt_for_download": False,
+      "download.directory_upgrade": True,
+      "plugins.always_open_pdf_externally": True # Attempt to force download PDFs
+    })
+    if headless:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--disable-gpu")
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+
+    if driver_path and os.path.exists(driver_path):
+        service = ChromeService(executable_path=driver_path)
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+    else:
+        # Assumes chromedriver is in PATH (or lets Selenium Manager find one)
+        driver = webdriver.Chrome(options=chrome_options)
+    if headless:
+        # Headless Chrome only saves downloads once download behavior is set explicitly
+        set_download_directory(driver, abs_download_dir)
+    return driver
+
+def set_download_directory(driver, directory):
+    """Points a running Chrome's downloads at `directory` (used when a browser switches cases, and per download)."""
+    driver.execute_cdp_cmd("Page.setDownloadBehavior", {"behavior": "allow", "downloadPath": os.path.abspath(directory)})
+
+def clone_chrome_profile(profile_dir, clone_dir):
+    """Refreshes `clone_dir` with a copy of `profile_dir`, skipping caches and lock files.
+
+    Chrome refuses to open one user data directory from two processes, so extra pool
+    workers run on clones of the shared profile and still get its cookies.
+    """
+    if os.path.exists(clone_dir):
+        shutil.rmtree(clone_dir, ignore_errors=True)
+    if os.path.exists(profile_dir):
+        shutil.copytree(profile_dir, clone_dir, ignore=shutil.ignore_patterns(*CHROME_PROFILE_SKIP))
+    return clone_dir
+
+class BrowserPool:
+    """A set of WebDriver sessions started in parallel and shared by crawling and downloading.
+
+    The first browser uses `profile_dir` itself; the others use fresh clones of it.
+    """
+
+    def __init__(self, size, download_dir, headless=False, profile_dir=None):
+        self.size = max(size, 1)
+        self.download_dir = download_dir
+        self.headless = headless
+        self.profile_dir = profile_dir
+        self.drivers = []
+
+    def _profile_for(self, index):
+        if not self.profile_dir or index == 0:
+            return self.profile_dir
+        return clone_chrome_profile(self.profile_dir, f"{self.profile_dir}-worker{index}")
+
+    def start(self):
+        """Launches every browser concurrently and returns the list of drivers."""
+        started = time.monotonic()
+        # Clone profiles before any Chrome opens the shared one and starts writing to it
+        profiles = [self._profile_for(i) for i in range(self.size)]
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [
+                executor.submit(create_driver, self.download_dir, self.headless, profile)
+                for profile in profiles
+            ]
+            errors = []
+            for future in futures:
+                try:
+                    self.drivers.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+        if errors:
+            self.quit()
+            raise errors[0]
+        logger.info(f"Started {self.size} browser(s) in {time.monotonic() - started:.2f}s (headless={self.headless}).")
+        return self.drivers
+
+    def quit(self):
+        for driver in self.drivers:
             try:
-                # Example: next_button = driver.find_element(By.LINK_TEXT, "Next")
-                # Example: next_button = driver.find_element(By.XPATH, "//a[contains(@class, 'next-page-button')]")
-                next_button = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, "/html/body/main/div[3]/div[2]/div[2]/div[2]/div[1]/a[3]")) # User-provided XPath
-                )
-                logger.info("Found 'Next Page' button. Clicking...")
-                driver.execute_script("arguments[0].scrollIntoView(true);", next_button) # Scroll to button
-                time.sleep(0.5) # Brief pause before click
-                driver.execute_script("arguments[0].click();", next_button) # JS click to bypass potential overlays
-                current_page_num += 1
-                # Wait for page to load after click
-                page_load_delay = random.uniform(3, 7)
-                logger.info(f"Waiting {page_load_delay:.2f} seconds for next page to load...")
-                time.sleep(page_load_delay) 
-            except (TimeoutException, NoSuchElementException):
-                logger.info("No 'Next Page' button found or not clickable. Assuming end of pagination.")
-                break # Exit loop if no next page button
+                driver.quit()
             except Exception as e:
-                logger.error(f"Error clicking 'Next Page' button: {e}")
+                logger.debug(f"Error closing WebDriver: {e}")
+        self.drivers = []
+
+# Cross-references in docket titles: "(related document(s)4137, 4136)",
+# "(related document:4146 Objection ...)" and "(Related Doc # 4119)"
+RELATED_DOCUMENTS_RE = re.compile(r'related\s+doc(?:ument)?(?:\(s\))?\s*[:#]?\s*', re.IGNORECASE)
+RELATED_NUMBER_RE = re.compile(r'(?:^|,)\s*(\d+)\b')
+
+def _top_level_text(text, start):
+    """Returns text[start:] up to the parenthesis that closes the enclosing group, leaving out nested groups."""
+    depth = 0
+    parts = []
+    for char in text[start:]:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            if depth == 0:
+                break
+            depth -= 1
+        elif depth == 0:
+            parts.append(char)
+    return ''.join(parts)
+
+def parse_related_docket_numbers(title):
+    """Returns the docket numbers a title refers to, in order of appearance and without duplicates.
+
+    A reference list may describe each document ("related document:4126 Motion re: ...,
+    4127 Supplemental Filing ..."), so numbers only count at the start of the list or right
+    after a comma, and descriptions nested in parentheses are skipped; their own "related
+    document" markers are picked up separately.
+    """
+    numbers = []
+    for marker in RELATED_DOCUMENTS_RE.finditer(title):
+        for match in RELATED_NUMBER_RE.finditer(_top_level_text(title, marker.end())):
+            number = int(match.group(1))
+            if number not in numbers:
+                numbers.append(number)
+    return numbers
+
+class DocketGraph:
+    """Docket-number graph of the cross-references in docket titles.
+
+    `references[dn]` holds the earlier filings document `dn` refers to and `referenced_by[dn]`
+    the later filings referring to it. A document can only refer to filings made before it,
+    so numbers that are not lower than the referring docket number (dates and the like) are
+    dropped.
+    """
+
+    def __init__(self, pdf_infos=()):
+        self.references = {}
+        self.referenced_by = {}
+        for info in pdf_infos:
+            self.add(info)
+
+    def add(self, pdf_info):
+        docket_number = parse_docket_number(pdf_info.get('docket_number'))
+        if docket_number is None:
+            return
+        for related in parse_related_docket_numbers(pdf_info.get('title', '')):
+            if related < docket_number:
+                self.references.setdefault(docket_number, set()).add(related)
+                self.referenced_by.setdefault(related, set()).add(docket_number)
+
+    def neighbors(self, docket_number):
+        return self.references.get(docket_number, set()) | self.referenced_by.get(docket_number, set())
+
+    def linked(self, docket_numbers, depth=1):
+        """Returns the given docket numbers plus everything within `depth` references of them, in either direction."""
+        found = set(docket_numbers)
+        frontier = set(docket_numbers)
+        for _ in range(depth):
+            frontier = {n for dn in frontier for n in self.neighbors(dn)} - found
+            if not frontier:
                 break
+            found |= frontier
+        return found
 
-        # PDF download logic is now moved inside the main try block
-        if not all_pdf_infos:
-            logger.warning("No suitable PDF links found after Selenium scraping.")
-            return  # Exit early if no PDFs found; finally block will still execute.
+def docket_sort_key(pdf_info):
+    """Sort key ordering entries by docket number, then filing date; entries without a number sort first."""
+    docket_number = parse_docket_number(pdf_info.get('docket_number'))
+    try:
+        date = datetime.strptime(pdf_info.get('date', ''), "%m/%d/%Y")
+    except ValueError:
+        date = datetime.min
+    return (-1 if docket_number is None else docket_number, date)
+
+def select_pdf_infos(pdf_infos, title_pattern=None, docket_numbers=(), related_depth=1,
+                     related_title_pattern=None, order="index"):
+    """Picks and orders the entries to download.
+
+    Entries whose title matches `title_pattern` (a case-insensitive regex) or whose docket
+    number is in `docket_numbers` are the seeds; with neither, every entry is selected. Seeds
+    bring in the documents within `related_depth` references of them, optionally only those
+    whose title matches `related_title_pattern`. `order` is "index" (as listed), "newest" or
+    "oldest" (by docket number). Entries with a non-numeric docket number (e.g. "12A") can
+    match the title pattern but have no related documents.
+    """
+    selected = list(pdf_infos)
+    if title_pattern or docket_numbers:
+        title_re = re.compile(title_pattern, re.IGNORECASE) if title_pattern else None
+        related_re = re.compile(related_title_pattern, re.IGNORECASE) if related_title_pattern else None
+        by_number = {}
+        for info in selected:
+            dn = parse_docket_number(info['docket_number'])
+            if dn is not None:
+                by_number[dn] = info
+        seeds = {int(dn) for dn in docket_numbers}
+        if title_re is not None:
+            seeds |= {dn for dn, info in by_number.items() if title_re.search(info['title'])}
+        graph = DocketGraph(selected)
+        wanted = set(seeds)
+        for dn in graph.linked(seeds, related_depth) - seeds:
+            info = by_number.get(dn)
+            if info is not None and (related_re is None or related_re.search(info['title'])):
+                wanted.add(dn)
+        selected = [
+            info for info in selected
+            if parse_docket_number(info['docket_number']) in wanted
+            or (title_re is not None and title_re.search(info['title']))
+        ]
+        logger.info(f"Selected {len(selected)} of {len(pdf_infos)} entries ({len(seeds)} matched directly, the rest related).")
+    if order == "newest":
+        selected.sort(key=docket_sort_key, reverse=True)
+    elif order == "oldest":
+        selected.sort(key=docket_sort_key)
+    return selected
+
+class Case:
+    """One Kroll restructuring case: its URL slug, output directory and link index."""
+
+    def __init__(self, slug, download_dir, links_db=None, legacy_links_file=None, api_endpoint=API_DOCKET_DATA_ENDPOINT):
+        self.slug = slug
+        self.download_dir = download_dir
+        self.links_db = links_db or f"scraped_links-{slug}.db"
+        self.legacy_links_file = legacy_links_file
+        self.page_url = f"{BASE_URL}/{slug}/Home-DocketInfo"
+        self.api_url = urljoin(self.page_url, api_endpoint)
+
+def default_case(api_endpoint=API_DOCKET_DATA_ENDPOINT):
+    """The single case configured by the module constants."""
+    case = Case(urlparse(PAGE_URL).path.strip('/').split('/')[0], DOWNLOAD_DIR, LINKS_DB, LINKS_FILE)
+    case.page_url = PAGE_URL
+    case.api_url = urljoin(PAGE_URL, api_endpoint)
+    return case
+
+def load_cases(filename, api_endpoint=API_DOCKET_DATA_ENDPOINT):
+    """Loads a case list from a JSON object mapping case slug to output directory."""
+    with open(filename, "r", encoding="utf-8") as f:
+        case_dirs = json.load(f)
+    default = default_case()
+    cases = []
+    for slug, download_dir in case_dirs.items():
+        if slug == default.slug:
+            # Keep using the index the single-case runs have been building
+            cases.append(Case(slug, download_dir, default.links_db, default.legacy_links_file, api_endpoint))
         else:
-            logger.info(
-                f"--- Collected a total of {len(all_pdf_infos)} PDF links. Starting downloads. ---"
+            cases.append(Case(slug, download_dir, api_endpoint=api_endpoint))
+    return cases
+
+def run_case(case, args, drivers, session, rate_limiter):
+    """Crawls one case's docket index and downloads its PDFs with the given browsers.
+
+    `rate_limiter` is shared by every case running in the process. `session` belongs to this
+    case, though it may share its connection pool with the other cases' sessions.
+    """
+    create_download_directory(case.download_dir)
+
+    # Open the link store so the scraper can resume from previously collected links
+    store = open_link_store(case.links_db, legacy_json_file=case.legacy_links_file)
+    manifest = DownloadManifest(case.links_db)
+    # Only open the FTS5 table when this run reads or writes it, so other runs work on SQLite builds without FTS5
+    needs_text_index = args.search or args.index_text or (args.text_index and not args.verify)
+    text_index = TextIndex(case.links_db) if needs_text_index else None
+    page_cache = PageCache(case.links_db) if args.page_cache else None
+    try:
+        if args.verify:
+            verify_downloads(manifest)
+            return
+        if args.search:
+            hits, seconds = search_text_index(text_index, args.search)
+            print(f"[{case.slug}] {len(hits)} hits for {args.search!r} in {seconds * 1000:.1f} ms")
+            for hit in hits:
+                print(f"{hit['rank']:8.2f}  DN {hit['docket_number']:>6}  {hit['date']}  {hit['title']}")
+                print(f"          {' '.join(hit['snippet'].split())}")
+            return
+        if args.index_text:
+            index_downloaded_text(store, manifest, text_index)
+            return
+
+        known_docket_number = None
+        if args.incremental:
+            known_docket_number = store.highest_docket_number()
+            if known_docket_number is None:
+                logger.info(f"[{case.slug}] Incremental mode requested but no docket numbers are indexed yet. Doing a full crawl.")
+            else:
+                logger.info(f"[{case.slug}] Incremental mode: newest known docket number is {known_docket_number}.")
+
+        logger.info(f"[{case.slug}] Starting PDF scraping from Kroll Docket Page: {case.page_url}")
+        case_started = time.monotonic()
+        driver = drivers[0]
+        for case_driver in drivers:
+            set_download_directory(case_driver, case.download_dir)
+
+        # driver.get waits for the page load, and row extraction waits for the table itself
+        with metrics.timer('page_load'):
+            driver.get(case.page_url)
+
+        if args.index_mode == "api":
+            # The docket page visit above sets the session cookies the API expects
+            copy_driver_cookies(driver, session)
+            crawl_driver = None
+            def crawl(on_new_links=None):
+                crawl_index_with_api(session, store, args.rows, known_docket_number, case.api_url, case.page_url,
+                                     rate_limiter, on_new_links, page_cache)
+        else:
+            crawl_driver = driver
+            def crawl(on_new_links=None):
+                crawl_index_with_selenium(driver, store, known_docket_number, rate_limiter, on_new_links, page_cache)
+
+        download_options = dict(
+            use_http=args.download_mode == "http", manifest=manifest,
+            interactive=not args.headless, session=session
+        )
+        selecting = bool(args.select_title or args.select_dn) or args.order != "index"
+        if args.pipeline and selecting:
+            # Selection and ordering need the whole index, so the crawl has to finish first
+            logger.info(f"[{case.slug}] A download selection or order was given; crawling the index before downloading.")
+        if args.pipeline and not selecting:
+            logger.info(f"[{case.slug}] Crawling the index and downloading new links as they are found...")
+            downloaded_count, failed_count, captcha_blocked_count = crawl_and_download(
+                crawl, store, drivers, crawl_driver, case.download_dir, rate_limiter, **download_options
             )
-            downloaded_count = 0
-            failed_count = 0
+            crawl_seconds = None
+        else:
+            crawl()
+            crawl_seconds = time.monotonic() - case_started
+            logger.info(f"[{case.slug}] Index crawl took {crawl_seconds:.1f}s; {len(store)} links indexed.")
 
-            # Deduplicate based on URL before downloading
-            unique_pdf_infos_to_download = []
-            seen_download_urls_download = set()
-            for pdf_info_item in all_pdf_infos:
-                if pdf_info_item['url'] not in seen_download_urls_download:
-                    unique_pdf_infos_to_download.append(pdf_info_item)
-                    seen_download_urls_download.add(pdf_info_item['url'])
+            # The store's unique URL index means these are already deduplicated
+            unique_pdf_infos_to_download = load_scraped_links(store)
+            if selecting:
+                unique_pdf_infos_to_download = select_pdf_infos(
+                    unique_pdf_infos_to_download, args.select_title, args.select_dn or (), args.related_depth,
+                    args.related_title, args.order
+                )
+            if not unique_pdf_infos_to_download:
+                logger.warning(f"[{case.slug}] No suitable PDF links found after scraping.")
+                return
 
             logger.info(
-                f"After deduplication, {len(unique_pdf_infos_to_download)} unique PDFs to attempt downloading."
+                f"[{case.slug}] --- Collected a total of {len(unique_pdf_infos_to_download)} unique PDF links. Starting downloads. ---"
+            )
+            downloaded_count, failed_count, captcha_blocked_count = download_all(
+                unique_pdf_infos_to_download, drivers, case.download_dir, rate_limiter, **download_options
             )
 
-            if driver:  # Ensure driver is still active for downloads
-                for i, pdf_info_item in enumerate(unique_pdf_infos_to_download):
-                    if i > 0:
-                        download_delay = random.uniform(3, 8)
-                        logger.info(
-                            f"Waiting for {download_delay:.2f} seconds before next download..."
-                        )
-                        time.sleep(download_delay)
-
-                    if download_pdf(driver, pdf_info_item, DOWNLOAD_DIR):
-                        downloaded_count += 1
-                    else:
-                        failed_count += 1
-
-                logger.info("--- Download Summary ---")
-                logger.info(
-                    f"Successfully downloaded/already existed: {downloaded_count} PDFs"
-                )
-                logger.info(f"Failed to download: {failed_count} PDFs")
-                logger.info(f"All files are located in: {DOWNLOAD_DIR}")
-            else:
-                logger.error(
-                    "WebDriver was not available for the download phase. Skipping downloads."
-                )
+        logger.info(f"[{case.slug}] --- Download Summary ---")
+        logger.info(
+            f"[{case.slug}] Successfully downloaded/already existed: {downloaded_count} PDFs"
+        )
+        logger.info(f"[{case.slug}] Failed to download: {failed_count} PDFs")
+        if captcha_blocked_count:
+            logger.info(f"[{case.slug}] Blocked by a CAPTCHA no one could solve: {captcha_blocked_count} PDFs")
+        logger.info(f"[{case.slug}] All files are located in: {case.download_dir}")
+        total_seconds = time.monotonic() - case_started
+        if crawl_seconds is None:
+            logger.info(f"[{case.slug}] Total time: {total_seconds:.1f}s (crawl and downloads overlapped)")
+        else:
+            logger.info(
+                f"[{case.slug}] Total time: {total_seconds:.1f}s "
+                f"(crawl {crawl_seconds:.1f}s, downloads {total_seconds - crawl_seconds:.1f}s)"
+            )
+
+        if text_index is not None:
+            index_downloaded_text(store, manifest, text_index)
+    finally:
+        # Links and downloads are committed as they happen; just close the databases
+        if page_cache is not None:
+            page_cache.close()
+        if text_index is not None:
+            text_index.close()
+        manifest.close()
+        store.close()
+
+def parse_args(argv=None):
+    """Parses command line options."""
+    parser = argparse.ArgumentParser(description="Scrape and download PDFs from a Kroll restructuring docket.")
+    parser.add_argument(
+        "--cases",
+        help="JSON file mapping Kroll case slugs to output directories, e.g. {\"bbby\": \"D:/dockets/bbby\"}. Cases run concurrently, one browser each. Defaults to the single bbby case."
+    )
+    parser.add_argument(
+        "--index-mode", choices=["browser", "api"], default="browser",
+        help="Collect the docket index by clicking through rendered pages (browser) or from the JSON API (api). The API endpoint is unverified; see --api-endpoint."
+    )
+    parser.add_argument(
+        "--api-endpoint", default=API_DOCKET_DATA_ENDPOINT,
+        help=f"Path of the docket grid's JSON endpoint, relative to the case's Home-DocketInfo page (default: {API_DOCKET_DATA_ENDPOINT}, a guess that hasn't been checked against the live site)."
+    )
+    parser.add_argument(
+        "--rows", type=int, default=API_ROWS_PER_PAGE,
+        help=f"Rows per request in api index mode (default: {API_ROWS_PER_PAGE})."
+    )
+    parser.add_argument(
+        "--no-pipeline", dest="pipeline", action="store_false",
+        help="Crawl the whole index before starting any download instead of downloading new links while the crawl runs."
+    )
+    parser.add_argument(
+        "--select-title", metavar="REGEX",
+        help="Only download entries whose title matches this case-insensitive regex, plus their related documents, e.g. '^order\\b'."
+    )
+    parser.add_argument(
+        "--select-dn", type=int, action="append", metavar="DN",
+        help="Only download this docket number and its related documents. Can be given several times."
+    )
+    parser.add_argument(
+        "--related-depth", type=int, default=1,
+        help="How many \"related document\" hops away from a selected entry to follow, in either direction; 0 downloads only the matches (default: 1)."
+    )
+    parser.add_argument(
+        "--related-title", metavar="REGEX",
+        help="Only bring in related documents whose title matches this regex, e.g. 'motion' for orders and their motions."
+    )
+    parser.add_argument(
+        "--order", choices=["index", "newest", "oldest"], default="index",
+        help="Download order: as listed in the index, or by docket number newest or oldest first (default: index)."
+    )
+    parser.add_argument(
+        "--no-page-cache", dest="page_cache", action="store_false",
+        help="Fetch and parse every index page in full instead of skipping pages that are unchanged since the last crawl."
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Stop paginating at the first page whose entries are all already in the links file."
+    )
+    parser.add_argument(
+        "--verify", action="store_true",
+        help="Re-hash every downloaded file listed in the manifest, drop corrupt or missing ones so they are fetched again, and exit."
+    )
+    parser.add_argument(
+        "--no-text-index", dest="text_index", action="store_false",
+        help="Skip extracting the text of new downloads into the full-text search index after downloading."
+    )
+    parser.add_argument(
+        "--index-text", action="store_true",
+        help="Only bring the full-text index up to date with the downloaded PDFs (needs pypdf), then exit."
+    )
+    parser.add_argument(
+        "--search", metavar="QUERY",
+        help="Search the full-text index and print ranked hits, then exit. Uses SQLite FTS5 syntax, e.g. 'motion NEAR(lift stay)' or 'title:objection'."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DOWNLOAD_WORKERS,
+        help=f"Number of browsers started in parallel; the first also crawls the index (default: {DOWNLOAD_WORKERS})."
+    )
+    parser.add_argument(
+        "--download-mode", choices=["http", "browser"], default="http",
+        help="Stream PDFs with requests using the browser's cookies, falling back to Chrome on CAPTCHA pages (http), or always download through Chrome (browser)."
+    )
+    parser.add_argument(
+        "--headless", action="store_true",
+        help="Run Chrome without a window. CAPTCHA pages can't be solved, so those items fail; solve the CAPTCHA once in a visible run sharing the same --profile-dir first."
+    )
+    parser.add_argument(
+        "--profile-dir", default=CHROME_PROFILE_DIR,
+        help=f"Persistent Chrome profile shared by all browsers so solved-CAPTCHA cookies carry over (default: {CHROME_PROFILE_DIR}; empty string disables)."
+    )
+    parser.add_argument(
+        "--driver-path", default=driver_path,
+        help="Path to chromedriver. Falls back to chromedriver on PATH when the file does not exist."
+    )
+    parser.add_argument(
+        "--metrics-json", default=METRICS_JSON_FILE,
+        help=f"Append a JSON line with per-stage timings and counters for this run (default: {METRICS_JSON_FILE}; empty string disables)."
+    )
+    parser.add_argument(
+        "--metrics-prom", default=METRICS_PROM_FILE,
+        help=f"Rewrite this Prometheus text-format file with the run's metrics, e.g. for node_exporter's textfile collector (default: {METRICS_PROM_FILE}; empty string disables)."
+    )
+    parser.add_argument(
+        "--rate", type=float, default=DOWNLOAD_RATE_PER_SECOND,
+        help=f"Maximum requests per second against one host, shared by all workers and cases. Pacing starts at half of this, speeds up while the site responds quickly and backs off on errors (default: {DOWNLOAD_RATE_PER_SECOND})."
+    )
+    return parser.parse_args(argv)
+
+def main(args=None):
+    """Main function to orchestrate the PDF downloading process using Selenium."""
+    global driver_path
+    if args is None:
+        args = parse_args([])
+    driver_path = args.driver_path
+    cases = load_cases(args.cases, args.api_endpoint) if args.cases else [default_case(args.api_endpoint)]
+
+    if args.verify or args.index_text or args.search:
+        for case in cases:
+            run_case(case, args, [], None, None)
+        return
+
+    run_started = time.monotonic()
+    # Initialize WebDriver pool. A single case uses every browser; with several cases each
+    # case borrows one browser and the cases run side by side.
+    pool = BrowserPool(args.workers, cases[0].download_dir, headless=args.headless, profile_dir=args.profile_dir)
+    # One connection pool and one rate limit for every case, since they all hit the same host.
+    # Each case gets its own session on that pool, so its browser's cookies don't overwrite
+    # another case's (the cookie names are the same on every case).
+    http_adapter = create_http_adapter(max(args.workers, 10))
+    rate_limiter = HostRateLimiter(args.rate)
+    try:
+        drivers = pool.start()
+
+        if len(cases) == 1:
+            run_case(cases[0], args, drivers, create_http_session(adapter=http_adapter), rate_limiter)
+        else:
+            idle_drivers = queue.Queue()
+            for driver in drivers:
+                idle_drivers.put(driver)
+
+            def run_on_idle_driver(case):
+                driver = idle_drivers.get()
+                try:
+                    run_case(case, args, [driver], create_http_session(adapter=http_adapter), rate_limiter)
+                except Exception as e:
+                    logger.error(f"[{case.slug}] An error occurred during Selenium processing or downloads: {e}")
+                finally:
+                    idle_drivers.put(driver)
+
+            with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+                list(executor.map(run_on_idle_driver, cases))
 
     except Exception as e:
         logger.error(f"An error occurred during Selenium processing or downloads: {e}")
     finally:
-        # Persist collected links even if an error occurred
-        save_scraped_links(LINKS_FILE, all_pdf_infos)
-        if driver:
-            logger.info("Closing Selenium WebDriver.")
-            driver.quit()
+        logger.info("Closing Selenium WebDriver(s).")
+        pool.quit()
+        http_adapter.close()
+        logger.info(f"Finished {len(cases)} case(s) in {time.monotonic() - run_started:.1f}s.")
+        metrics.log_summary()
+        metrics.write(args.metrics_json, args.metrics_prom)
 
 if __name__ == "__main__":
     setup_logging()
-    main()
+    main(parse_args())